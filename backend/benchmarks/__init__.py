@@ -0,0 +1 @@
+# Benchmarks package for portfolio API
\ No newline at end of file
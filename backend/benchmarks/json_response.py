@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: stdlib JSONResponse vs ORJSONResponse for portfolio payloads
+
+Renders the same jsonable content FastAPI hands to the response class after
+response_model serialization, checks both paths produce byte-identical JSON, and
+reports per-render timings.
+
+    cd backend && python -m benchmarks.json_response --projects 50 --number 2000
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from models.portfolio import Portfolio, PersonalInfo, TechStack, Project, Education, Contact
+
+
+def build_portfolio(project_count: int) -> Portfolio:
+    return Portfolio(
+        personal=PersonalInfo(name="Benchmark", title="Developer", location="India", bio="Bio " * 100),
+        tech_stack=TechStack(languages=["Python"], frameworks=["FastAPI"], tools=["Git"], databases=["MongoDB"]),
+        projects=[
+            Project(
+                name=f"Project {i}",
+                description="A project used for benchmarking " * 3,
+                details="Details about the project " * 20,
+                technologies=["React.js", "Node.js", "MongoDB", "Tailwind CSS"],
+                live_link=f"https://example.com/{i}",
+                github_link=f"https://github.com/example/{i}",
+                featured=i % 3 == 0,
+            )
+            for i in range(project_count)
+        ],
+        education=[Education(degree="B.Tech", institution="JIIT", graduation_year="2026", status="Pursuing")],
+        contact=Contact(email="bench@example.com"),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    content = jsonable_encoder(build_portfolio(args.projects))
+    stdlib_body = JSONResponse(content).body
+    orjson_body = ORJSONResponse(content).body
+    if stdlib_body != orjson_body:
+        print("❌ Outputs differ")
+        sys.exit(1)
+
+    results = {}
+    for name, response_class in (("JSONResponse", JSONResponse), ("ORJSONResponse", ORJSONResponse)):
+        seconds = min(timeit.repeat(lambda: response_class(content), number=args.number, repeat=5))
+        results[name] = seconds / args.number * 1e6
+
+    print(f"Payload: {len(orjson_body)} bytes, {args.projects} projects")
+    for name, micros in results.items():
+        print(f"  {name:<15} {micros:9.1f} µs/render")
+    print(f"  Speedup: {results['JSONResponse'] / results['ORJSONResponse']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for the portfolio API endpoints
+
+Drives the ASGI app in-process (on the in-memory storage backend, or a real
+Mongo with --mongo-url), or a running server with --url. Each endpoint is hit by
+--concurrency workers for --requests requests, and throughput plus
+p50/p95/p99 latency are reported. Results can be written as JSON and checked
+against a stored baseline; regressions beyond --tolerance exit non-zero.
+
+    cd backend
+    python -m benchmarks.load --concurrency 20 --requests 2000 --output results.json
+    python -m benchmarks.load --baseline results.json
+    python -m benchmarks.load --url http://localhost:8001/api
+    python -m benchmarks.load --seed-projects 100000 --seed-messages 100000 --only search
+
+With --seed-* the in-process storage is first filled with a reproducible
+synthetic dataset (see benchmarks/seed.py) instead of the sample portfolio.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+PROJECT = {
+    "name": "Benchmark Project",
+    "description": "A project created by the load benchmark",
+    "details": "Details " * 50,
+    "technologies": ["React.js", "Node.js", "MongoDB"],
+    "featured": False,
+}
+
+CONTACT = {"name": "Load Test", "email": "load@example.com", "message": "Hello from the benchmark"}
+
+
+class ProjectPool:
+    """Throwaway projects for the delete scenarios, which use up one id per delete"""
+
+    def __init__(self):
+        self.ids = []
+
+    async def fill(self, client, count):
+        while len(self.ids) < count:
+            batch = min(count - len(self.ids), 1000)
+            response = await client.post("/projects/bulk", json=[PROJECT] * batch)
+            response.raise_for_status()
+            self.ids += [item["id"] for item in response.json()["results"]]
+
+    def take(self, count=1):
+        taken, self.ids = self.ids[:count], self.ids[count:]
+        return taken
+
+
+def scenarios(project_id: str, message_id: str, portfolio: dict, pool: ProjectPool):
+    """(name, method, path, json body, pool ids per request) for the routes in routes/portfolio.py
+
+    Paths and bodies may be callables, evaluated per request. GET /portfolio/events
+    is left out: the stream never ends, so it has no request latency to measure.
+    """
+    bulk = [{**PROJECT, "id": f"benchmark-bulk-{index}"} for index in range(10)]
+    return [
+        ("GET /portfolio", "GET", "/portfolio", None, 0),
+        ("GET /portfolio/cache-stats", "GET", "/portfolio/cache-stats", None, 0),
+        ("GET /projects", "GET", "/projects", None, 0),
+        ("GET /projects?featured&limit", "GET", "/projects?featured=true&limit=10", None, 0),
+        ("GET /projects/{id}", "GET", f"/projects/{project_id}", None, 0),
+        ("GET /projects/search", "GET", "/projects/search?q=realtime+dash&limit=20", None, 0),
+        ("GET /technologies", "GET", "/technologies", None, 0),
+        ("POST /projects", "POST", "/projects", PROJECT, 0),
+        ("PUT /projects/{id}", "PUT", f"/projects/{project_id}", PROJECT, 0),
+        ("DELETE /projects/{id}", "DELETE", lambda: f"/projects/{pool.take()[0]}", None, 1),
+        ("POST /projects/bulk", "POST", "/projects/bulk", bulk, 0),
+        ("POST /projects/bulk-delete", "POST", "/projects/bulk-delete", lambda: {"ids": pool.take(10)}, 10),
+        ("POST /contact", "POST", "/contact", CONTACT, 0),
+        ("GET /contact-messages", "GET", "/contact-messages?limit=50", None, 0),
+        ("GET /contact-messages/export", "GET", "/contact-messages/export?format=csv", None, 0),
+        ("PUT /contact-messages/replied", "PUT", "/contact-messages/replied", {"ids": [message_id]}, 0),
+        ("PUT /contact-messages/{id}/replied", "PUT", f"/contact-messages/{message_id}/replied", None, 0),
+        # Last, as POST /portfolio gives every project a new id
+        ("PUT /portfolio", "PUT", "/portfolio", {"personal": portfolio["personal"]}, 0),
+        ("POST /portfolio", "POST", "/portfolio", portfolio, 0),
+    ]
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(client, method, path, body, concurrency, total):
+    latencies = []
+    errors = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            url = path() if callable(path) else path
+            payload = body() if callable(body) else body
+            started = time.perf_counter()
+            response = await client.request(method, url, json=payload)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def in_process_app(mongo_url):
+    """Import the app on in-memory storage, or on the given Mongo"""
+    if mongo_url:
+        os.environ["STORAGE_BACKEND"] = "mongo"
+        os.environ["MONGO_URL"] = mongo_url
+        os.environ.setdefault("DB_NAME", "portfolio_benchmark")
+    else:
+        os.environ["STORAGE_BACKEND"] = "memory"
+    # Keep the spam limiter out of the way of the contact benchmark
+    os.environ.setdefault("CONTACT_BURST", "1e9")
+    os.environ.setdefault("CONTACT_GLOBAL_BURST", "1e9")
+
+    import server
+    return server.app
+
+
+async def seed_in_process(args):
+    import server
+    from routes import portfolio
+    from services.seed import Seeder
+
+    if args.url:
+        sys.exit("--seed-* only works in-process; seed a running server with benchmarks/seed.py")
+    started = time.perf_counter()
+    counts = await Seeder(server.storage, batch_size=5000).synthetic(
+        args.seed_projects, 3, args.seed_messages, args.seed
+    )
+    await portfolio.portfolio_changed("portfolio.seeded")
+    print(f"  seeded {counts['projects']:,} projects and {counts['messages']:,} messages "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+async def benchmark(args):
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url.rstrip("/"), timeout=30)
+        app = None
+    else:
+        app = in_process_app(args.mongo_url)
+        await app.router.startup()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench/api")
+
+    try:
+        if args.seed_projects or args.seed_messages:
+            await seed_in_process(args)
+        else:
+            await client.post("/init-portfolio")
+        created = await client.post("/projects", json=PROJECT)
+        created.raise_for_status()
+        project_id = created.json()["id"]
+        message = await client.post("/contact", json=CONTACT)
+        message.raise_for_status()
+        portfolio = await client.get("/portfolio")
+        portfolio.raise_for_status()
+        pool = ProjectPool()
+
+        results = {}
+        for name, method, path, body, consumes in scenarios(
+            project_id, message.json()["id"], portfolio.json(), pool
+        ):
+            if args.only and args.only not in name:
+                continue
+            warm_up = min(args.requests, 50)
+            await pool.fill(client, consumes * (warm_up + args.requests))
+            # A short warm-up fills caches and snapshots before measuring
+            await run_scenario(client, method, path, body, args.concurrency, warm_up)
+            results[name] = await run_scenario(client, method, path, body, args.concurrency, args.requests)
+            stats = results[name]
+            print(f"  {name:<30} {stats['throughput_rps']:>9.1f} req/s  "
+                  f"p50 {stats['p50_ms']:>8.2f} ms  p95 {stats['p95_ms']:>8.2f} ms  "
+                  f"p99 {stats['p99_ms']:>8.2f} ms  errors {stats['errors']}")
+        return results
+    finally:
+        await client.aclose()
+        if app is not None:
+            await app.router.shutdown()
+
+
+def compare(results, baseline, tolerance):
+    """Return regression messages for endpoints that got slower than the baseline allows"""
+    regressions = []
+    for name, stats in results.items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before:
+            continue
+        if stats["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {stats['throughput_rps']} < baseline {before['throughput_rps']} req/s"
+            )
+        for key in ("p95_ms", "p99_ms"):
+            if stats[key] > before[key] * (1 + tolerance):
+                regressions.append(f"{name}: {key} {stats[key]} > baseline {before[key]}")
+        if stats["errors"] > before["errors"]:
+            regressions.append(f"{name}: {stats['errors']} errors (baseline {before['errors']})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Benchmark a running server (e.g. http://localhost:8001/api)")
+    parser.add_argument("--mongo-url", help="Run in-process against this Mongo instead of memory storage")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per endpoint")
+    parser.add_argument("--only", help="Only run endpoints whose name contains this text")
+    parser.add_argument("--output", help="Write machine-readable results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a previous --output file")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed regression fraction")
+    parser.add_argument("--seed-projects", type=int, default=0, help="Seed this many synthetic projects first")
+    parser.add_argument("--seed-messages", type=int, default=0, help="Seed this many synthetic messages first")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the synthetic dataset")
+    args = parser.parse_args()
+
+    target = args.url or ("in-process, " + ("Mongo at " + args.mongo_url if args.mongo_url else "memory storage"))
+    print(f"🚀 Benchmarking portfolio API ({target}), concurrency {args.concurrency}, "
+          f"{args.requests} requests per endpoint")
+    results = asyncio.run(benchmark(args))
+
+    report = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "target": target,
+        "python": platform.python_version(),
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "seed": {"projects": args.seed_projects, "messages": args.seed_messages, "seed": args.seed},
+        "endpoints": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"📝 Results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        if regressions:
+            print("❌ Regressions against baseline:")
+            for message in regressions:
+                print(f"  - {message}")
+            sys.exit(1)
+        print("✅ No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Seed the configured storage with a fixture or a synthetic dataset
+
+Uses the same STORAGE_BACKEND / MONGO_URL / PROJECTS_STORAGE settings as the
+server. Synthetic data is reproducible: the same --seed always produces the
+same projects, education entries and messages, and re-running updates them in
+place. Projects are written with batched bulk upserts and messages with
+batched insert_many, so 10k-1M record datasets load with flat memory.
+
+    cd backend
+    python -m benchmarks.seed --projects 100000 --messages 500000 --seed 7
+    python -m benchmarks.seed --fixture fixtures/portfolio.json
+    MEMORY_SNAPSHOT_PATH=/tmp/portfolio.json STORAGE_BACKEND=memory python -m benchmarks.seed --projects 10000
+
+Large project counts need PROJECTS_STORAGE=collection (or memory storage);
+embedded projects share the portfolio document's 16 MB limit.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.seed import Seeder, load_fixture
+
+
+def progress_printer():
+    started = time.perf_counter()
+
+    def report(kind, done):
+        elapsed = time.perf_counter() - started
+        print(f"\r  {kind:<9} {done:>9,}  ({done / elapsed:,.0f}/s)", end="", flush=True)
+
+    return report
+
+
+async def seed(args):
+    import server
+
+    storage = server.storage
+    await storage.start()
+    await storage.ensure_indexes()
+    try:
+        seeder = Seeder(storage, batch_size=args.batch_size, progress=progress_printer())
+        if args.fixture:
+            counts = await seeder.fixture(load_fixture(args.fixture), replace=not args.keep)
+        else:
+            counts = await seeder.synthetic(args.projects, args.education, args.messages, args.seed,
+                                            replace=not args.keep)
+        print()
+        return counts
+    finally:
+        await storage.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixture", help="Load this JSON fixture instead of generating data")
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--education", type=int, default=3)
+    parser.add_argument("--messages", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for synthetic data")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--keep", action="store_true", help="Upsert into existing projects instead of replacing them")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = asyncio.run(seed(args))
+    print(f"✅ Seeded {counts['projects']:,} projects, {counts['education']:,} education entries and "
+          f"{counts['messages']:,} new messages in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
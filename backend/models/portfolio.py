@@ -40,6 +40,19 @@ class ProjectCreate(BaseModel):
     image: Optional[str] = None
     featured: bool = False
 
+class ProjectUpsert(ProjectCreate):
+    id: Optional[str] = None
+
+class ProjectSearchHit(Project):
+    score: float
+
+class TechnologyFacet(BaseModel):
+    name: str
+    key: str
+    count: int
+    project_ids: List[str]
+    categories: List[str] = []
+
 class Education(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     degree: str
@@ -79,6 +92,7 @@ class Portfolio(BaseModel):
     projects: List[Project]
     education: List[Education]
     contact: Contact
+    version: int = 0
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -92,4 +106,36 @@ class PortfolioCreate(BaseModel):
 class PortfolioUpdate(BaseModel):
     personal: Optional[PersonalInfo] = None
     tech_stack: Optional[TechStack] = None
-    contact: Optional[Contact] = None
\ No newline at end of file
+    contact: Optional[Contact] = None
+
+# Bulk operation models
+class BulkIds(BaseModel):
+    ids: List[str]
+
+class BulkItemResult(BaseModel):
+    id: str
+    status: str
+
+class BulkResult(BaseModel):
+    results: List[BulkItemResult]
+
+# Seeding models
+class SeedRequest(BaseModel):
+    projects: int = Field(100, ge=0, le=1_000_000)
+    education: int = Field(3, ge=0, le=10_000)
+    messages: int = Field(0, ge=0, le=1_000_000)
+    seed: int = 42
+    batch_size: int = Field(1000, ge=1, le=10_000)
+    replace: bool = True
+
+class SeedResult(BaseModel):
+    projects: int
+    education: int
+    messages: int
+
+# Image models
+class ImageInfo(BaseModel):
+    id: str
+    width: int
+    src: str
+    srcset: str
@@ -0,0 +1 @@
+# Repositories package for portfolio API
\ No newline at end of file
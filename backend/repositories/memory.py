@@ -0,0 +1,392 @@
+from typing import AsyncIterator, List, Optional, Tuple
+from datetime import datetime
+from pathlib import Path
+from repositories.pagination import decode_cursor, paginate
+from repositories.projects import version_filter
+import asyncio
+import bisect
+import copy
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def _version_matches(document: dict, version: Optional[int]) -> bool:
+    if version is None:
+        return True
+    expected = version_filter(version)
+    current = document.get("version")
+    return current in expected["$in"] if isinstance(expected, dict) else current == expected
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _decode(value: dict):
+    if set(value) == {"$date"}:
+        return datetime.fromisoformat(value["$date"])
+    return value
+
+
+class MemoryState:
+    """Everything the in-memory backend stores
+
+    The portfolio document is copy-on-write: every write builds a new dict, so
+    documents handed to readers (and the read cache) never change under them.
+    Only the top-level dict and the projects list are copied per write; a
+    mutation replaces the project dicts it changes instead of editing them.
+    Messages are kept sorted by (created_at, id).
+    """
+
+    def __init__(self):
+        self.portfolio = None
+        self.messages = []
+        self.message_keys = []
+        self.messages_by_id = {}
+        self.dirty = False
+        self._project_positions = None
+
+    def set_portfolio(self, document: Optional[dict]):
+        self.portfolio = document
+        self._project_positions = None
+        self.dirty = True
+
+    def project_positions(self) -> dict:
+        """Index of each project id in the current projects list"""
+        if self._project_positions is None:
+            projects = (self.portfolio or {}).get("projects", [])
+            self._project_positions = {project["id"]: index for index, project in enumerate(projects)}
+        return self._project_positions
+
+    def write_portfolio(self, mutate, touch: bool = True):
+        """Apply mutate to a shallow copy of the portfolio and make it current
+
+        mutate may append to or replace items of document["projects"], but must
+        not edit the dicts inside it; positions of existing projects must stay
+        put unless it calls forget_positions().
+        """
+        document = dict(self.portfolio)
+        if "projects" in document:
+            document["projects"] = list(document["projects"])
+        result = mutate(document)
+        if touch:
+            document["updated_at"] = datetime.utcnow()
+            document["version"] = document.get("version", 0) + 1
+        self.portfolio = document
+        self.dirty = True
+        return result
+
+    def forget_positions(self):
+        self._project_positions = None
+
+    def add_message(self, message: dict):
+        message = dict(message)
+        key = (message["created_at"], message["id"])
+        index = bisect.bisect(self.message_keys, key)
+        self.message_keys.insert(index, key)
+        self.messages.insert(index, message)
+        self.messages_by_id[message["id"]] = message
+        self.dirty = True
+
+    def dump(self) -> str:
+        return json.dumps({"portfolio": self.portfolio, "messages": self.messages}, default=_encode)
+
+    def load(self, raw: str):
+        data = json.loads(raw, object_hook=_decode)
+        self.set_portfolio(data.get("portfolio"))
+        self.messages, self.message_keys, self.messages_by_id = [], [], {}
+        for message in data.get("messages", []):
+            self.add_message(message)
+        self.dirty = False
+
+
+class MemoryPortfolioRepository:
+    def __init__(self, state: MemoryState):
+        self.state = state
+
+    async def ensure_indexes(self):
+        pass
+
+    async def get_active(self) -> Optional[dict]:
+        return self.state.portfolio
+
+    async def exists(self) -> bool:
+        return self.state.portfolio is not None
+
+    async def version(self) -> Optional[int]:
+        return None if self.state.portfolio is None else self.state.portfolio.get("version", 0)
+
+    async def create(self, document: dict):
+        self.state.set_portfolio(copy.deepcopy(document))
+
+    async def update(self, fields: dict) -> bool:
+        if self.state.portfolio is None:
+            return False
+        fields = copy.deepcopy(fields)
+
+        def mutate(document):
+            # updated_at comes from the caller, like a Mongo $set
+            document.update(fields)
+            document["version"] = document.get("version", 0) + 1
+            if "projects" in fields:
+                self.state.forget_positions()
+
+        self.state.write_portfolio(mutate, touch=False)
+        return True
+
+
+class MemoryProjectStore:
+    """Projects held in the in-memory portfolio document"""
+
+    indexed = False
+
+    def __init__(self, state: MemoryState):
+        self.state = state
+
+    async def ensure_indexes(self):
+        pass
+
+    async def attach(self, portfolio: dict):
+        """Projects already live on the document"""
+
+    def _find(self, project_id: str) -> Optional[dict]:
+        index = self.state.project_positions().get(project_id)
+        return None if index is None else self.state.portfolio["projects"][index]
+
+    async def load(self, project_id: Optional[str] = None) -> Optional[dict]:
+        portfolio = self.state.portfolio
+        if portfolio is None:
+            return None
+        projects = portfolio.get("projects", [])
+        if project_id:
+            projects = [project for project in projects if project["id"] == project_id]
+        return {"version": portfolio.get("version", 0), "updated_at": portfolio.get("updated_at"),
+                "projects": projects}
+
+    async def exists(self, project_id: str) -> bool:
+        return self._find(project_id) is not None
+
+    async def insert(self, project: dict) -> bool:
+        if self.state.portfolio is None:
+            return False
+        project = copy.deepcopy(project)
+
+        def mutate(document):
+            projects = document.setdefault("projects", [])
+            self.state.project_positions()[project["id"]] = len(projects)
+            projects.append(project)
+
+        self.state.write_portfolio(mutate)
+        return True
+
+    async def update(self, project_id: str, fields: dict, version: Optional[int]) -> Optional[dict]:
+        portfolio = self.state.portfolio
+        if portfolio is None or self._find(project_id) is None or not _version_matches(portfolio, version):
+            return None
+        fields = copy.deepcopy(fields)
+
+        index = self.state.project_positions()[project_id]
+
+        def mutate(document):
+            project = document["projects"][index] = {**document["projects"][index], **fields}
+            return project
+
+        return self.state.write_portfolio(mutate)
+
+    async def delete(self, project_id: str, version: Optional[int]) -> bool:
+        portfolio = self.state.portfolio
+        if portfolio is None or self._find(project_id) is None or not _version_matches(portfolio, version):
+            return False
+
+        def mutate(document):
+            document["projects"] = [p for p in document["projects"] if p["id"] != project_id]
+            self.state.forget_positions()
+
+        self.state.write_portfolio(mutate)
+        return True
+
+    async def bulk_upsert(self, projects: List[dict]) -> Optional[List[str]]:
+        if self.state.portfolio is None:
+            return None
+        projects = copy.deepcopy(projects)
+
+        def mutate(document):
+            stored = document.setdefault("projects", [])
+            positions = self.state.project_positions()
+            statuses = []
+            for project in projects:
+                index = positions.get(project["id"])
+                if index is not None:
+                    changes = {k: v for k, v in project.items() if k not in ("id", "created_at")}
+                    stored[index] = {**stored[index], **changes}
+                    statuses.append("updated")
+                else:
+                    positions[project["id"]] = len(stored)
+                    stored.append(project)
+                    statuses.append("created")
+            return statuses
+
+        return self.state.write_portfolio(mutate)
+
+    async def bulk_delete(self, project_ids: List[str]) -> Optional[set]:
+        if self.state.portfolio is None:
+            return None
+        found = set(self.state.project_positions()).intersection(project_ids)
+        if found:
+            def mutate(document):
+                document["projects"] = [p for p in document["projects"] if p["id"] not in found]
+                self.state.forget_positions()
+
+            self.state.write_portfolio(mutate)
+        return found
+
+
+class MemoryMessageRepository:
+    def __init__(self, state: MemoryState):
+        self.state = state
+
+    async def ensure_indexes(self):
+        pass
+
+    async def insert(self, message: dict):
+        self.state.add_message(message)
+
+    async def insert_many(self, messages: List[dict]) -> int:
+        """Insert a batch, skipping ids already stored; returns how many were new"""
+        inserted = 0
+        for message in messages:
+            if message["id"] not in self.state.messages_by_id:
+                self.state.add_message(message)
+                inserted += 1
+        return inserted
+
+    async def list_page(self, limit: int, after: Optional[str] = None,
+                        replied: Optional[bool] = None) -> Tuple[List[dict], Optional[str]]:
+        """Newest first, keyset-paginated on (created_at, id)"""
+        end = len(self.state.messages)
+        if after:
+            end = bisect.bisect_left(self.state.message_keys, decode_cursor(after))
+        page = []
+        for index in range(end - 1, -1, -1):
+            message = self.state.messages[index]
+            if replied is None or message.get("replied", False) == replied:
+                page.append(dict(message))
+                if len(page) > limit:
+                    break
+        return paginate(page, limit)
+
+    async def export(self, since: Optional[datetime] = None,
+                     until: Optional[datetime] = None) -> AsyncIterator[dict]:
+        keys = self.state.message_keys
+        start = bisect.bisect_left(keys, (since,)) if since else 0
+        end = bisect.bisect_left(keys, (until,)) if until else len(keys)
+        for index in range(start, min(end, len(self.state.messages))):
+            yield dict(self.state.messages[index])
+            if index % 1000 == 999:
+                # Let other requests run during long exports
+                await asyncio.sleep(0)
+
+    async def mark_replied(self, message_ids: List[str]) -> set:
+        found = set()
+        for message_id in message_ids:
+            message = self.state.messages_by_id.get(message_id)
+            if message is not None:
+                message["replied"] = True
+                found.add(message_id)
+        if found:
+            self.state.dirty = True
+        return found
+
+    async def mark_one_replied(self, message_id: str) -> bool:
+        return bool(await self.mark_replied([message_id]))
+
+
+class MemoryStorage:
+    """Process-local storage, optionally snapshotted to a JSON file
+
+    Suited to single-node deployments, tests and benchmarks. With a
+    snapshot_path, state is loaded on start, written back every
+    snapshot_interval seconds when it changed, and on close.
+    """
+
+    name = "memory"
+
+    def __init__(self, snapshot_path: Optional[str] = None, snapshot_interval: float = 5.0):
+        self.state = MemoryState()
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self.snapshot_interval = snapshot_interval
+        self.projects = MemoryProjectStore(self.state)
+        self.portfolios = MemoryPortfolioRepository(self.state)
+        self.messages = MemoryMessageRepository(self.state)
+        # A single process needs no shared idempotency store
+        self.idempotency = None
+        self._snapshot_task = None
+        self._closing = asyncio.Event()
+
+    async def start(self):
+        if self.snapshot_path is None:
+            return
+        if self.snapshot_path.exists():
+            self.state.load(self.snapshot_path.read_text())
+            logger.info("Loaded memory storage snapshot from %s", self.snapshot_path)
+        self._snapshot_task = asyncio.create_task(self._snapshot_loop())
+
+    async def ensure_indexes(self):
+        pass
+
+    async def ping(self):
+        pass
+
+    def watch_versions(self):
+        """A single process has no other writers to watch"""
+        return None
+
+    def pool_stats(self) -> Optional[dict]:
+        return None
+
+    async def _snapshot_loop(self):
+        # Stopped through _closing, not cancelled: a cancelled to_thread write keeps running
+        while True:
+            try:
+                await asyncio.wait_for(self._closing.wait(), self.snapshot_interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.save_snapshot()
+            except Exception:
+                logger.exception("Failed to write memory storage snapshot")
+
+    async def save_snapshot(self):
+        if self.snapshot_path is None or not self.state.dirty:
+            return
+        # Serialize on the loop so no write interleaves, then write the file off it
+        raw = self.state.dump()
+        # Cleared first so writes made during the file write mark it dirty again
+        self.state.dirty = False
+        try:
+            await asyncio.to_thread(self._write_atomic, raw)
+        except Exception:
+            self.state.dirty = True
+            raise
+
+    def _write_atomic(self, raw: str):
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.snapshot_path.with_name(f".{self.snapshot_path.name}.{os.getpid()}.tmp")
+        with open(temp_path, "w") as handle:
+            handle.write(raw)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temp_path, self.snapshot_path)
+
+    async def close(self):
+        if self._snapshot_task is not None:
+            self._closing.set()
+            await self._snapshot_task
+            self._snapshot_task = None
+        await self.save_snapshot()
@@ -0,0 +1,108 @@
+from typing import List
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Sentinel queued by close() so the flusher drains everything submitted before it
+_STOP = object()
+
+
+class QueueFull(Exception):
+    pass
+
+
+class BufferedMessageWriter:
+    """Write-behind buffer that batches contact messages into insert_many calls
+
+    Messages are flushed once batch_size are waiting or flush_interval seconds
+    after the first one arrived, whichever comes first. At most max_queue
+    messages are held at a time, including the batch being written.
+    """
+
+    def __init__(self, repository, batch_size: int = 50, flush_interval: float = 0.5,
+                 max_queue: int = 1000, max_retries: int = 3):
+        self.repository = repository
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.max_queue = max_queue
+        self._queue = asyncio.Queue()
+        # Accepted but not yet written or dropped; the queue alone misses the batch in flight
+        self._pending = 0
+        self._task = None
+        self._closed = False
+        self.flushed = 0
+        self.batches = 0
+        self.dropped = 0
+
+    def start(self):
+        if self._task is None:
+            self._closed = False
+            self._task = asyncio.create_task(self._run())
+
+    def submit(self, document: dict):
+        """Queue a message for insertion; raises QueueFull when the buffer is at capacity"""
+        if self._closed or self._task is None:
+            raise QueueFull("Message writer is not running")
+        if self._pending >= self.max_queue:
+            raise QueueFull("Message buffer is full")
+        self._queue.put_nowait(document)
+        self._pending += 1
+
+    async def close(self):
+        """Stop accepting messages and flush everything already queued"""
+        if self._task is None:
+            return
+        self._closed = True
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[dict]):
+        try:
+            for attempt in range(1, self.max_retries + 1):
+                try:
+                    await self.repository.insert_many(batch)
+                    self.flushed += len(batch)
+                    self.batches += 1
+                    return
+                except Exception:
+                    logger.exception("Failed to flush %d contact messages (attempt %d)", len(batch), attempt)
+                    await asyncio.sleep(0.1 * 2 ** attempt)
+            self.dropped += len(batch)
+            logger.error("Dropped contact messages: %s", [doc.get("id") for doc in batch])
+        finally:
+            self._pending -= len(batch)
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "pending": self._pending,
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "dropped": self.dropped,
+        }
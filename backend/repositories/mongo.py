@@ -0,0 +1,221 @@
+from typing import AsyncIterator, List, Optional, Tuple
+from datetime import datetime
+from pymongo import DESCENDING
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from repositories.pagination import keyset_filter, paginate
+from repositories.projects import create_project_store
+import asyncio
+
+DUPLICATE_KEY = 11000
+
+# Inbox order, newest first; the indexes below serve it with or without the replied filter
+MESSAGE_SORT = [("created_at", DESCENDING), ("id", DESCENDING)]
+
+
+class MongoPortfolioRepository:
+    """The active portfolio document in db.portfolio"""
+
+    def __init__(self, database, project_store):
+        self.db = database
+        self.projects = project_store
+
+    async def ensure_indexes(self):
+        # At most one active portfolio, and find_one({"active": True}) becomes an index lookup
+        await self.db.portfolio.create_index(
+            "active", unique=True, partialFilterExpression={"active": True}
+        )
+
+    async def get_active(self) -> Optional[dict]:
+        """The active portfolio with its projects attached"""
+        document = await self.db.portfolio.find_one({"active": True})
+        if document is not None:
+            await self.projects.attach(document)
+        return document
+
+    async def exists(self) -> bool:
+        return await self.db.portfolio.find_one({"active": True}, {"_id": 1}) is not None
+
+    async def version(self) -> Optional[int]:
+        """The active portfolio's version without loading the document"""
+        document = await self.db.portfolio.find_one({"active": True}, {"_id": 0, "version": 1})
+        return None if document is None else document.get("version", 0)
+
+    async def create(self, document: dict):
+        document = dict(document)
+        if self.projects.indexed:
+            await self.projects.replace_all(document.pop("projects"))
+        await self.db.portfolio.insert_one(document)
+
+    async def update(self, fields: dict) -> bool:
+        """$set fields on the active portfolio and bump its version"""
+        fields = dict(fields)
+        if "projects" in fields and self.projects.indexed:
+            await self.projects.replace_all(fields.pop("projects"))
+        result = await self.db.portfolio.update_one(
+            {"active": True},
+            {"$set": fields, "$inc": {"version": 1}}
+        )
+        return result.matched_count == 1
+
+
+class MongoMessageRepository:
+    """Contact messages in db.contact_messages"""
+
+    def __init__(self, database):
+        self.db = database
+
+    async def ensure_indexes(self):
+        await self.db.contact_messages.create_index("id", unique=True)
+        await self.db.contact_messages.create_index(MESSAGE_SORT)
+        await self.db.contact_messages.create_index([("replied", 1)] + MESSAGE_SORT)
+
+    async def insert(self, message: dict):
+        await self.db.contact_messages.insert_one(dict(message))
+
+    async def insert_many(self, messages: List[dict]) -> int:
+        """Insert a batch, skipping ids already stored; returns how many were new"""
+        # Unordered so one bad document doesn't block the rest of the batch
+        try:
+            result = await self.db.contact_messages.insert_many([dict(m) for m in messages], ordered=False)
+            return len(result.inserted_ids)
+        except BulkWriteError as exc:
+            # A retried or re-seeded batch hits the unique id index; anything else is real
+            if any(error["code"] != DUPLICATE_KEY for error in exc.details["writeErrors"]):
+                raise
+            return exc.details["nInserted"]
+
+    async def list_page(self, limit: int, after: Optional[str] = None,
+                        replied: Optional[bool] = None) -> Tuple[List[dict], Optional[str]]:
+        """Newest first, keyset-paginated on (created_at, id)"""
+        query = {}
+        if replied is not None:
+            query["replied"] = replied
+        if after:
+            query.update(keyset_filter(after, descending=True))
+        find = self.db.contact_messages.find(query, {"_id": 0}).sort(MESSAGE_SORT).limit(limit + 1)
+        return paginate(await find.to_list(None), limit)
+
+    async def export(self, since: Optional[datetime] = None,
+                     until: Optional[datetime] = None) -> AsyncIterator[dict]:
+        """Oldest first, streamed from the cursor one batch at a time"""
+        query = {}
+        if since or until:
+            query["created_at"] = {}
+            if since:
+                query["created_at"]["$gte"] = since
+            if until:
+                query["created_at"]["$lt"] = until
+        cursor = self.db.contact_messages.find(query, {"_id": 0}).sort(
+            [("created_at", 1), ("id", 1)]
+        ).batch_size(1000)
+        async for message in cursor:
+            yield message
+
+    async def mark_replied(self, message_ids: List[str]) -> set:
+        """Mark messages replied with one update_many; returns the ids that existed"""
+        found = await self.db.contact_messages.find(
+            {"id": {"$in": list(message_ids)}}, {"_id": 0, "id": 1}
+        ).to_list(None)
+        found_ids = {message["id"] for message in found}
+        if found_ids:
+            await self.db.contact_messages.update_many(
+                {"id": {"$in": list(found_ids)}},
+                {"$set": {"replied": True}}
+            )
+        return found_ids
+
+    async def mark_one_replied(self, message_id: str) -> bool:
+        result = await self.db.contact_messages.update_one(
+            {"id": message_id},
+            {"$set": {"replied": True}}
+        )
+        return result.matched_count == 1
+
+
+class MongoIdempotencyRepository:
+    """Idempotency-Key claims and stored responses in db.idempotency_keys"""
+
+    def __init__(self, database):
+        self.db = database
+
+    async def ensure_indexes(self):
+        # Mongo drops each record once expires_at has passed (checked about once a minute)
+        await self.db.idempotency_keys.create_index("expires_at", expireAfterSeconds=0)
+
+    async def claim(self, key: str, fingerprint: str, expires_at: datetime) -> Optional[dict]:
+        """Claim key for this request; returns None if claimed, else the existing record"""
+        record = {"_id": key, "fingerprint": fingerprint, "response": None, "expires_at": expires_at}
+        try:
+            await self.db.idempotency_keys.insert_one(record)
+            return None
+        except DuplicateKeyError:
+            pass
+        existing = await self.db.idempotency_keys.find_one({"_id": key})
+        if existing is not None and existing["expires_at"] > datetime.utcnow():
+            return existing
+        # Expired but not yet removed by the TTL monitor, or removed just now
+        await self.db.idempotency_keys.delete_one({"_id": key, "expires_at": {"$lte": datetime.utcnow()}})
+        try:
+            await self.db.idempotency_keys.insert_one(record)
+            return None
+        except DuplicateKeyError:
+            return await self.db.idempotency_keys.find_one({"_id": key})
+
+    async def complete(self, key: str, response: dict, expires_at: datetime):
+        await self.db.idempotency_keys.update_one(
+            {"_id": key},
+            {"$set": {"response": response, "expires_at": expires_at}}
+        )
+
+    async def release(self, key: str):
+        """Drop an unfinished claim so the request can be retried"""
+        await self.db.idempotency_keys.delete_one({"_id": key, "response": None})
+
+
+class MongoStorage:
+    """Storage backed by a MongoDB database through Motor"""
+
+    name = "mongo"
+
+    def __init__(self, client, database, pool_monitor=None, warm_connections: int = 1):
+        self.client = client
+        self.db = database
+        self.pool_monitor = pool_monitor
+        self.warm_connections = max(warm_connections, 1)
+        self.projects = create_project_store(database)
+        self.portfolios = MongoPortfolioRepository(database, self.projects)
+        self.messages = MongoMessageRepository(database)
+        self.idempotency = MongoIdempotencyRepository(database)
+
+    async def start(self):
+        """Open the connection pool ahead of the first request"""
+        # Concurrent pings each check out their own connection
+        await asyncio.gather(*(self.ping() for _ in range(self.warm_connections)))
+
+    async def ensure_indexes(self):
+        await self.portfolios.ensure_indexes()
+        await self.projects.ensure_indexes()
+        await self.messages.ensure_indexes()
+        await self.idempotency.ensure_indexes()
+
+    async def ping(self):
+        await self.client.admin.command("ping")
+
+    async def watch_versions(self) -> AsyncIterator[int]:
+        """Portfolio versions as any worker commits them (needs a replica set)"""
+        pipeline = [
+            {"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}},
+            {"$project": {"fullDocument.version": 1, "updateDescription.updatedFields.version": 1}},
+        ]
+        async with self.db.portfolio.watch(pipeline) as stream:
+            async for change in stream:
+                fields = change.get("updateDescription", {}).get("updatedFields", {})
+                version = fields.get("version", (change.get("fullDocument") or {}).get("version"))
+                if version is not None:
+                    yield version
+
+    def pool_stats(self) -> Optional[dict]:
+        return self.pool_monitor.stats() if self.pool_monitor else None
+
+    async def close(self):
+        self.client.close()
@@ -0,0 +1,48 @@
+from typing import List, Optional, Tuple
+from datetime import datetime, timezone
+import base64
+import json
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(item: dict) -> str:
+    """Opaque keyset cursor for an item's (created_at, id) position"""
+    created_at = item["created_at"]
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    raw = json.dumps([created_at, item["id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded))
+        created_at = datetime.fromisoformat(created_at)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor("Invalid cursor") from exc
+    # Stored timestamps are naive UTC and can't be compared with an offset one
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return created_at, str(item_id)
+
+
+def keyset_filter(cursor: str, descending: bool = False) -> dict:
+    """Mongo filter for items strictly after the cursor in (created_at, id) order"""
+    created_at, item_id = decode_cursor(cursor)
+    op = "$lt" if descending else "$gt"
+    return {"$or": [
+        {"created_at": {op: created_at}},
+        {"created_at": created_at, "id": {op: item_id}},
+    ]}
+
+
+def paginate(items: List[dict], limit: Optional[int]) -> Tuple[List[dict], Optional[str]]:
+    """Trim a list fetched with limit + 1 items and build the next cursor"""
+    if limit is None or len(items) <= limit:
+        return items, None
+    page = items[:limit]
+    return page, encode_cursor(page[-1])
@@ -0,0 +1,303 @@
+from typing import List, Optional, Tuple
+from datetime import datetime
+from pymongo import ASCENDING, InsertOne, ReplaceOne, ReturnDocument, UpdateOne
+from repositories.pagination import decode_cursor, keyset_filter, paginate
+import os
+
+# "embedded" keeps projects inside the portfolio document, "collection" stores them in db.projects
+PROJECTS_STORAGE = os.environ.get("PROJECTS_STORAGE", "embedded")
+
+# Projects are listed oldest first; (created_at, id) is the keyset for cursors
+PROJECT_SORT = [("created_at", ASCENDING), ("id", ASCENDING)]
+
+
+def version_filter(version: int):
+    """Match an expected document version; a missing field counts as version 0"""
+    return {"$in": [0, None]} if version == 0 else version
+
+
+def filter_projects(
+    projects: List[dict],
+    featured: Optional[bool] = None,
+    technology: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """Filter and page an in-memory project list the same way the indexed store does"""
+    matches = [
+        project for project in projects
+        if (featured is None or project.get("featured", False) == featured)
+        and (technology is None or technology in project.get("technologies", []))
+    ]
+    matches.sort(key=lambda project: (project["created_at"], project["id"]))
+    if cursor:
+        after = decode_cursor(cursor)
+        matches = [p for p in matches if (p["created_at"], p["id"]) > after]
+    if limit is not None:
+        matches = matches[:limit + 1]
+    return paginate(matches, limit)
+
+
+class EmbeddedProjectStore:
+    """Projects kept as an array inside the active portfolio document"""
+
+    indexed = False
+
+    def __init__(self, database):
+        self.db = database
+
+    async def ensure_indexes(self):
+        pass
+
+    async def attach(self, portfolio: dict):
+        """Projects already live on the document"""
+
+    async def load(self, project_id: Optional[str] = None) -> Optional[dict]:
+        """Load version, updated_at and the projects (or the one matching project)"""
+        projects = {"$elemMatch": {"id": project_id}} if project_id else 1
+        return await self.db.portfolio.find_one(
+            {"active": True},
+            {"_id": 0, "projects": projects, "version": 1, "updated_at": 1}
+        )
+
+    async def insert(self, project: dict) -> bool:
+        result = await self.db.portfolio.update_one(
+            {"active": True},
+            {
+                "$push": {"projects": project},
+                "$set": {"updated_at": datetime.utcnow()},
+                "$inc": {"version": 1}
+            }
+        )
+        return result.matched_count == 1
+
+    def _write_filter(self, project_id: str, version: Optional[int]) -> dict:
+        query = {"active": True, "projects.id": project_id}
+        if version is not None:
+            query["version"] = version_filter(version)
+        return query
+
+    async def update(self, project_id: str, fields: dict, version: Optional[int]) -> Optional[dict]:
+        # Only the matched array element is rewritten, so concurrent edits to other projects survive
+        update_fields = {f"projects.$.{key}": value for key, value in fields.items()}
+        update_fields["updated_at"] = datetime.utcnow()
+        portfolio = await self.db.portfolio.find_one_and_update(
+            self._write_filter(project_id, version),
+            {"$set": update_fields, "$inc": {"version": 1}},
+            projection={"_id": 0, "projects": {"$elemMatch": {"id": project_id}}},
+            return_document=ReturnDocument.AFTER
+        )
+        return portfolio["projects"][0] if portfolio else None
+
+    async def delete(self, project_id: str, version: Optional[int]) -> bool:
+        result = await self.db.portfolio.update_one(
+            self._write_filter(project_id, version),
+            {
+                "$pull": {"projects": {"id": project_id}},
+                "$set": {"updated_at": datetime.utcnow()},
+                "$inc": {"version": 1}
+            }
+        )
+        return result.matched_count == 1
+
+    async def exists(self, project_id: str) -> bool:
+        portfolio = await self.load(project_id)
+        return bool(portfolio and portfolio.get("projects"))
+
+    async def _existing_ids(self, project_ids: List[str]) -> Optional[set]:
+        """Which of project_ids exist; the filtering happens server-side, so only matches come back"""
+        pipeline = [
+            {"$match": {"active": True}},
+            {"$project": {"_id": 0, "ids": {"$filter": {
+                "input": {"$ifNull": ["$projects.id", []]},
+                "as": "id",
+                "cond": {"$in": ["$$id", list(project_ids)]}
+            }}}}
+        ]
+        portfolios = await self.db.portfolio.aggregate(pipeline).to_list(1)
+        if not portfolios:
+            return None
+        return set(portfolios[0]["ids"])
+
+    async def bulk_upsert(self, projects: List[dict]) -> Optional[List[str]]:
+        """Create or update many projects in one bulk_write; returns a status per project"""
+        existing = await self._existing_ids([project["id"] for project in projects])
+        if existing is None:
+            return None
+        new_projects, updates, statuses = [], [], []
+        for project in projects:
+            if project["id"] in existing:
+                fields = {f"projects.$.{key}": value for key, value in project.items()
+                          if key not in ("id", "created_at")}
+                updates.append(UpdateOne({"active": True, "projects.id": project["id"]}, {"$set": fields}))
+                statuses.append("updated")
+            else:
+                new_projects.append(project)
+                existing.add(project["id"])
+                statuses.append("created")
+        # The push goes first so later updates in the same batch can target new projects
+        push = UpdateOne({"active": True}, {
+            "$push": {"projects": {"$each": new_projects}},
+            "$set": {"updated_at": datetime.utcnow()},
+            "$inc": {"version": 1}
+        })
+        await self.db.portfolio.bulk_write([push] + updates, ordered=True)
+        return statuses
+
+    async def bulk_delete(self, project_ids: List[str]) -> Optional[set]:
+        """Delete many projects with a single $pull; returns the ids that existed"""
+        found = await self._existing_ids(project_ids)
+        if found is None:
+            return None
+        if found:
+            await self.db.portfolio.update_one({"active": True}, {
+                "$pull": {"projects": {"id": {"$in": list(found)}}},
+                "$set": {"updated_at": datetime.utcnow()},
+                "$inc": {"version": 1}
+            })
+        return found
+
+
+class CollectionProjectStore:
+    """Projects stored one per document in db.projects"""
+
+    indexed = True
+
+    def __init__(self, database):
+        self.db = database
+
+    async def ensure_indexes(self):
+        await self.db.projects.create_index("id", unique=True)
+        await self.db.projects.create_index(PROJECT_SORT)
+        await self.db.projects.create_index([("featured", ASCENDING)] + PROJECT_SORT)
+
+    async def _all(self, query: Optional[dict] = None) -> List[dict]:
+        cursor = self.db.projects.find(query or {}, {"_id": 0}).sort(PROJECT_SORT)
+        return await cursor.to_list(None)
+
+    async def attach(self, portfolio: dict):
+        portfolio["projects"] = await self._all()
+
+    async def load(self, project_id: Optional[str] = None) -> Optional[dict]:
+        portfolio = await self.db.portfolio.find_one(
+            {"active": True}, {"_id": 0, "version": 1, "updated_at": 1}
+        )
+        if portfolio is not None:
+            portfolio["projects"] = await self._all({"id": project_id} if project_id else None)
+        return portfolio
+
+    async def list_page(
+        self,
+        featured: Optional[bool] = None,
+        technology: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        query = {}
+        if featured is not None:
+            query["featured"] = featured
+        if technology is not None:
+            query["technologies"] = technology
+        if cursor:
+            query.update(keyset_filter(cursor))
+        find = self.db.projects.find(query, {"_id": 0}).sort(PROJECT_SORT)
+        if limit is not None:
+            find = find.limit(limit + 1)
+        return paginate(await find.to_list(None), limit)
+
+    async def _touch(self, version: Optional[int] = None) -> bool:
+        """Bump the portfolio version, optionally only if it is still at the expected one"""
+        query = {"active": True}
+        if version is not None:
+            query["version"] = version_filter(version)
+        result = await self.db.portfolio.update_one(
+            query, {"$set": {"updated_at": datetime.utcnow()}, "$inc": {"version": 1}}
+        )
+        return result.matched_count == 1
+
+    async def insert(self, project: dict) -> bool:
+        if not await self._touch():
+            return False
+        await self.db.projects.insert_one(dict(project))
+        return True
+
+    async def update(self, project_id: str, fields: dict, version: Optional[int]) -> Optional[dict]:
+        if not await self.exists(project_id) or not await self._touch(version):
+            return None
+        return await self.db.projects.find_one_and_update(
+            {"id": project_id},
+            {"$set": fields},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def delete(self, project_id: str, version: Optional[int]) -> bool:
+        if not await self.exists(project_id) or not await self._touch(version):
+            return False
+        result = await self.db.projects.delete_one({"id": project_id})
+        return result.deleted_count == 1
+
+    async def exists(self, project_id: str) -> bool:
+        return await self.db.projects.find_one({"id": project_id}, {"_id": 1}) is not None
+
+    async def _existing_ids(self, project_ids: List[str]) -> set:
+        found = self.db.projects.find({"id": {"$in": list(project_ids)}}, {"_id": 0, "id": 1})
+        return {project["id"] for project in await found.to_list(None)}
+
+    async def bulk_upsert(self, projects: List[dict]) -> Optional[List[str]]:
+        """Create or update many projects in one bulk_write; returns a status per project"""
+        if not await self._touch():
+            return None
+        existing = await self._existing_ids([project["id"] for project in projects])
+        operations, statuses = [], []
+        for project in projects:
+            if project["id"] in existing:
+                fields = {key: value for key, value in project.items() if key not in ("id", "created_at")}
+                operations.append(UpdateOne({"id": project["id"]}, {"$set": fields}))
+                statuses.append("updated")
+            else:
+                operations.append(InsertOne(dict(project)))
+                existing.add(project["id"])
+                statuses.append("created")
+        if operations:
+            await self.db.projects.bulk_write(operations, ordered=True)
+        return statuses
+
+    async def bulk_delete(self, project_ids: List[str]) -> Optional[set]:
+        """Delete many projects with a single delete_many; returns the ids that existed"""
+        if not await self._touch():
+            return None
+        found = await self._existing_ids(project_ids)
+        if found:
+            await self.db.projects.delete_many({"id": {"$in": list(found)}})
+        return found
+
+    async def replace_all(self, projects: List[dict]):
+        await self.db.projects.delete_many({})
+        if projects:
+            await self.db.projects.insert_many([dict(project) for project in projects])
+
+    async def migrate_embedded(self) -> int:
+        """Move projects out of the portfolio document into db.projects"""
+        portfolio = await self.db.portfolio.find_one({"active": True}, {"projects": 1})
+        projects = (portfolio or {}).get("projects")
+        if not projects:
+            return 0
+        await self.ensure_indexes()
+        # Upserts make a re-run after a partial failure safe
+        await self.db.projects.bulk_write(
+            [ReplaceOne({"id": project["id"]}, project, upsert=True) for project in projects]
+        )
+        await self.db.portfolio.update_one(
+            {"active": True},
+            {"$unset": {"projects": ""}, "$set": {"updated_at": datetime.utcnow()}, "$inc": {"version": 1}}
+        )
+        return len(projects)
+
+
+def create_project_store(database, storage: str = PROJECTS_STORAGE):
+    if storage == "collection":
+        return CollectionProjectStore(database)
+    if storage == "embedded":
+        return EmbeddedProjectStore(database)
+    raise ValueError(f"Unknown PROJECTS_STORAGE: {storage}")
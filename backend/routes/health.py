@@ -0,0 +1,52 @@
+from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
+import asyncio
+import os
+import time
+
+router = APIRouter()
+
+# Storage backend will be injected
+storage = None
+
+def init_storage(backend):
+    global storage
+    storage = backend
+
+# Readiness fails once any of these are crossed
+READY_MAX_PING_MS = float(os.environ.get("READY_MAX_PING_MS", "250"))
+READY_MAX_CHECKOUT_WAIT_MS = float(os.environ.get("READY_MAX_CHECKOUT_WAIT_MS", "100"))
+READY_PING_TIMEOUT = float(os.environ.get("READY_PING_TIMEOUT", "2"))
+
+@router.get("/health/live")
+async def liveness():
+    """The process is up and serving requests"""
+    return {"status": "alive"}
+
+@router.get("/health/ready")
+async def readiness():
+    """Whether this worker should receive traffic, based on database health"""
+    problems = []
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(storage.ping(), READY_PING_TIMEOUT)
+        ping_ms = round((time.perf_counter() - started) * 1000, 3)
+    except Exception as exc:
+        ping_ms = None
+        problems.append(f"database ping failed: {exc.__class__.__name__}")
+    
+    # Only pooled backends report pool stats
+    pool = storage.pool_stats()
+    if ping_ms is not None and ping_ms > READY_MAX_PING_MS:
+        problems.append(f"ping {ping_ms} ms exceeds {READY_MAX_PING_MS} ms")
+    if pool and pool["checkout_wait_ms_max"] > READY_MAX_CHECKOUT_WAIT_MS:
+        problems.append(
+            f"pool checkout wait {pool['checkout_wait_ms_max']} ms exceeds {READY_MAX_CHECKOUT_WAIT_MS} ms"
+        )
+    
+    body = {
+        "status": "not_ready" if problems else "ready",
+        "database": {"backend": storage.name, "ping_ms": ping_ms, "pool": pool},
+        "problems": problems,
+    }
+    return ORJSONResponse(body, status_code=503 if problems else 200)
@@ -0,0 +1,142 @@
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from typing import Optional
+from models.portfolio import ImageInfo
+from pathlib import Path
+from services.images import (
+    FORMATS, UPLOAD_TYPES, DiskLRUCache, ImagePipeline, OriginalsFull, UnreadableImage,
+    available, negotiate_format, supported_formats
+)
+from services.publish import safe_name
+import asyncio
+import os
+
+router = APIRouter()
+
+MEDIA_DIR = Path(__file__).parent.parent / "media"
+IMAGE_ORIGINALS_DIR = os.environ.get("IMAGE_ORIGINALS_DIR", str(MEDIA_DIR / "originals"))
+IMAGE_CACHE_DIR = os.environ.get("IMAGE_CACHE_DIR", str(MEDIA_DIR / "variants"))
+IMAGE_CACHE_MAX_BYTES = int(float(os.environ.get("IMAGE_CACHE_MAX_MB", "512")) * 1024 * 1024)
+IMAGE_MAX_UPLOAD_BYTES = int(float(os.environ.get("IMAGE_MAX_UPLOAD_MB", "10")) * 1024 * 1024)
+IMAGE_ORIGINALS_MAX_BYTES = int(float(os.environ.get("IMAGE_ORIGINALS_MAX_MB", "1024")) * 1024 * 1024)
+
+# Originals are kept forever, so uploads stay off unless asked for
+ALLOW_IMAGE_UPLOADS = os.environ.get("ALLOW_IMAGE_UPLOADS", "false").lower() in ("1", "true", "yes")
+
+# Requested widths round up to one of these, which bounds how many variants can exist
+IMAGE_WIDTHS = [int(width) for width in os.environ.get("IMAGE_WIDTHS", "320,640,960,1280,1920").split(",")]
+
+# Variant URLs from srcset carry the original's content hash, so they never change meaning
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+IMAGE_CACHE_CONTROL = f"public, max-age={int(os.environ.get('IMAGE_CACHE_MAX_AGE', '3600'))}"
+
+image_pipeline = ImagePipeline(
+    IMAGE_ORIGINALS_DIR,
+    DiskLRUCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES),
+    IMAGE_WIDTHS,
+    max_concurrency=int(os.environ.get("IMAGE_MAX_CONCURRENT_RENDERS", "2")),
+    max_original_bytes=IMAGE_ORIGINALS_MAX_BYTES
+)
+
+
+def _require_pipeline():
+    if not available():
+        raise HTTPException(status_code=503, detail="Image processing is not available (install Pillow)")
+
+
+def _variant_url(name: str, width: int, digest: str) -> str:
+    return f"/api/images/{name}?w={width}&v={digest}"
+
+
+async def _image_info(name: str) -> ImageInfo:
+    if not safe_name(name):
+        raise HTTPException(status_code=404, detail="Image not found")
+    try:
+        digest, widths = await image_pipeline.srcset_widths(name)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Image not found")
+    largest, rendered = widths[-1]
+    return ImageInfo(
+        id=name,
+        width=rendered,
+        src=_variant_url(name, largest, digest),
+        srcset=", ".join(f"{_variant_url(name, width, digest)} {actual}w" for width, actual in widths)
+    )
+
+@router.post("/images", response_model=ImageInfo)
+async def upload_image(request: Request):
+    """Store an original image sent as the raw request body (admin only)"""
+    if not ALLOW_IMAGE_UPLOADS:
+        raise HTTPException(status_code=403, detail="Image uploads are disabled; set ALLOW_IMAGE_UPLOADS=true")
+    _require_pipeline()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    extension = UPLOAD_TYPES.get(content_type)
+    if extension is None:
+        raise HTTPException(status_code=415, detail=f"Unsupported image type; send one of {', '.join(UPLOAD_TYPES)}")
+
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > IMAGE_MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="Image is too large")
+    try:
+        name = await asyncio.to_thread(image_pipeline.store_original, bytes(body), extension)
+    except OriginalsFull:
+        raise HTTPException(status_code=507, detail="Image storage is full")
+    except UnreadableImage:
+        raise HTTPException(status_code=400, detail="Body is not a readable image")
+    return await _image_info(name)
+
+@router.get("/images/cache-stats")
+async def get_image_cache_stats():
+    """Get size and hit/miss counters for the image variant cache (admin only)"""
+    return {
+        **image_pipeline.cache.stats(),
+        "originals_bytes": await asyncio.to_thread(image_pipeline.original_bytes),
+        "originals_max_bytes": image_pipeline.max_original_bytes,
+        "formats": list(supported_formats()),
+    }
+
+@router.get("/images/{name}/srcset", response_model=ImageInfo)
+async def get_image_srcset(name: str):
+    """Get responsive src/srcset URLs for a stored original"""
+    _require_pipeline()
+    return await _image_info(name)
+
+@router.get("/images/{name}")
+async def get_image(
+    name: str,
+    request: Request,
+    w: Optional[int] = Query(None, ge=1, le=10000),
+    format: Optional[str] = Query(None, pattern="^(avif|webp|jpeg)$"),
+    v: Optional[str] = None
+):
+    """Get a resized, re-encoded variant of a stored original
+
+    Without an explicit format, the best one the client Accepts is used
+    (AVIF, then WebP, then JPEG).
+    """
+    _require_pipeline()
+    if not safe_name(name):
+        raise HTTPException(status_code=404, detail="Image not found")
+    if format is not None and format not in supported_formats():
+        raise HTTPException(status_code=400, detail=f"Format {format} is not supported by this server")
+    output_format = format or negotiate_format(request.headers.get("accept", ""))
+    width = image_pipeline.snap_width(w)
+
+    try:
+        path, digest = await image_pipeline.variant(name, width, output_format)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    etag = f'"{digest}-{width}-{output_format}"'
+    headers = {
+        "ETag": etag,
+        # Only URLs pinned to the current content may be cached forever
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if v == digest else IMAGE_CACHE_CONTROL,
+    }
+    if format is None:
+        headers["Vary"] = "Accept"
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=FORMATS[output_format]["mime"], headers=headers)
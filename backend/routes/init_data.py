@@ -1,23 +1,28 @@
-from fastapi import APIRouter
-from models.portfolio import Portfolio, PersonalInfo, TechStack, Project, Education, Contact
+from fastapi import APIRouter, Body, HTTPException, Query
+from models.portfolio import Portfolio, PersonalInfo, TechStack, Project, Education, Contact, SeedRequest, SeedResult
+from routes.portfolio import portfolio_changed
+from services.seed import Seeder
 from datetime import datetime
+import os
 
 router = APIRouter()
 
-# Database connection will be injected
-db = None
+# Bulk seeding can write millions of records, so it stays off unless asked for
+ALLOW_SEEDING = os.environ.get("ALLOW_SEEDING", "false").lower() in ("1", "true", "yes")
 
-def init_db(database):
-    global db
-    db = database
+# Storage backend will be injected
+storage = None
+
+def init_storage(backend):
+    global storage
+    storage = backend
 
 @router.post("/init-portfolio")
 async def initialize_portfolio():
     """Initialize portfolio with Nishant's data"""
     
     # Check if portfolio already exists
-    existing_portfolio = await db.portfolio.find_one({"active": True})
-    if existing_portfolio:
+    if await storage.portfolios.exists():
         return {"message": "Portfolio already exists"}
     
     # Create Nishant's portfolio data
@@ -91,11 +96,62 @@ async def initialize_portfolio():
             "linkedin": "https://www.linkedin.com/in/nishant-dwivedi-0a2b2b226",
             "github": "https://github.com/NishantDwd"
         },
+        "version": 0,
         "created_at": datetime.utcnow(),
         "updated_at": datetime.utcnow()
     }
     
     # Insert the portfolio data
-    await db.portfolio.insert_one(portfolio_data)
+    await storage.portfolios.create(portfolio_data)
+    await portfolio_changed("portfolio.created")
+    
+    return {"message": "Portfolio initialized successfully", "portfolio_id": portfolio_data["id"]}
+
+@router.post("/migrate-projects")
+async def migrate_projects():
+    """Move embedded projects into the projects collection (PROJECTS_STORAGE=collection)"""
+    if not storage.projects.indexed:
+        raise HTTPException(status_code=409, detail="Set PROJECTS_STORAGE=collection before migrating projects")
+    
+    migrated = await storage.projects.migrate_embedded()
+    await portfolio_changed("projects.migrated")
     
-    return {"message": "Portfolio initialized successfully", "portfolio_id": portfolio_data["id"]}
\ No newline at end of file
+    return {"message": "Projects migrated successfully", "migrated": migrated}
+
+def _require_seeding():
+    if not ALLOW_SEEDING:
+        raise HTTPException(status_code=403, detail="Seeding is disabled; set ALLOW_SEEDING=true")
+
+@router.post("/seed", response_model=SeedResult)
+async def seed_synthetic(request_data: SeedRequest):
+    """Generate a reproducible synthetic portfolio for load testing"""
+    _require_seeding()
+    seeder = Seeder(storage, batch_size=request_data.batch_size)
+    try:
+        counts = await seeder.synthetic(
+            request_data.projects, request_data.education, request_data.messages,
+            request_data.seed, replace=request_data.replace
+        )
+    finally:
+        # A failed seed may still have written part of its batches
+        if seeder.wrote:
+            await portfolio_changed("portfolio.seeded")
+    return SeedResult(**counts)
+
+@router.post("/seed/fixture", response_model=SeedResult)
+async def seed_fixture(
+    fixture: dict = Body(...),
+    replace: bool = True,
+    batch_size: int = Query(1000, ge=1, le=10_000)
+):
+    """Bulk-upsert a portfolio from a JSON fixture shaped like the Portfolio model"""
+    _require_seeding()
+    seeder = Seeder(storage, batch_size=batch_size)
+    try:
+        counts = await seeder.fixture(fixture, replace=replace)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    finally:
+        if seeder.wrote:
+            await portfolio_changed("portfolio.seeded")
+    return SeedResult(**counts)
\ No newline at end of file
@@ -1,179 +1,863 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from datetime import datetime
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from typing import List, Optional
+from datetime import datetime, timezone
 from models.portfolio import (
     Portfolio, PortfolioCreate, PortfolioUpdate,
-    Project, ProjectCreate, Education, EducationCreate,
-    ContactMessage, ContactMessageCreate
+    Project, ProjectCreate, ProjectUpsert, ProjectSearchHit, Education, EducationCreate,
+    ContactMessage, ContactMessageCreate, BulkIds, BulkItemResult, BulkResult, TechnologyFacet
 )
-from motor.motor_asyncio import AsyncIOMotorClient
+from pydantic import TypeAdapter
+from repositories.message_buffer import BufferedMessageWriter, QueueFull
+from repositories.pagination import InvalidCursor
+from repositories.projects import filter_projects
+from services.compression import compress_max, negotiate_encoding
+from services.events import EventBroadcaster
+from services.export import csv_lines, gzip_stream, ndjson_lines
+from services.idempotency import IdempotencyKeyInProgress, IdempotencyKeyReused, IdempotencyStore
+from services.publish import SnapshotPublisher, safe_name
+from services.rate_limit import RateLimiter, rate_limit
+from services.search import ProjectSearchIndex
+from services.technologies import TechnologyFacets
+import asyncio
+import hashlib
+import json
+import logging
 import os
+import time
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Database connection will be injected
-db = None
+# Opt-in write-behind buffering for contact form submissions
+CONTACT_WRITE_BEHIND = os.environ.get("CONTACT_WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+
+# Upper bound on items accepted by a single bulk request
+BULK_MAX_ITEMS = int(os.environ.get("BULK_MAX_ITEMS", "1000"))
+
+# Spam protection for the public contact form
+contact_rate_limiter = RateLimiter(
+    rate=float(os.environ.get("CONTACT_RATE_PER_MINUTE", "5")) / 60,
+    burst=float(os.environ.get("CONTACT_BURST", "5")),
+    global_rate=float(os.environ.get("CONTACT_GLOBAL_RATE_PER_MINUTE", "120")) / 60,
+    global_burst=float(os.environ.get("CONTACT_GLOBAL_BURST", "60")),
+    max_clients=int(os.environ.get("RATE_LIMIT_MAX_CLIENTS", "10000"))
+)
+
+# Retried POSTs that carry the same Idempotency-Key get the first response back
+IDEMPOTENCY_TTL = float(os.environ.get("IDEMPOTENCY_TTL", "86400"))
+# Share keys across workers through the storage backend when it offers a store
+IDEMPOTENCY_SHARED = os.environ.get("IDEMPOTENCY_SHARED", "true").lower() in ("1", "true", "yes")
+
+# Storage backend will be injected
+storage = None
+message_writer = None
+idempotency_store = None
+
+def init_storage(backend):
+    global storage, message_writer, idempotency_store
+    storage = backend
+    idempotency_store = IdempotencyStore(
+        ttl=IDEMPOTENCY_TTL,
+        max_entries=int(os.environ.get("IDEMPOTENCY_MAX_KEYS", "10000")),
+        repository=backend.idempotency if IDEMPOTENCY_SHARED else None
+    )
+    if CONTACT_WRITE_BEHIND:
+        message_writer = BufferedMessageWriter(
+            backend.messages,
+            batch_size=int(os.environ.get("CONTACT_BATCH_SIZE", "50")),
+            flush_interval=float(os.environ.get("CONTACT_FLUSH_INTERVAL", "0.5")),
+            max_queue=int(os.environ.get("CONTACT_QUEUE_SIZE", "1000"))
+        )
+
+
+_project_list_adapter = TypeAdapter(List[Project])
+
+# Serve reads from pre-serialized JSON instead of re-validating the document per request
+SNAPSHOTS_ENABLED = os.environ.get("PORTFOLIO_SNAPSHOTS", "true").lower() in ("1", "true", "yes")
+
+
+class PortfolioEntry:
+    """A loaded portfolio document plus values derived from it"""
+
+    def __init__(self, document: dict):
+        self.document = document
+        self._etag = None
+        self._portfolio_json = None
+        self._projects_json = None
+        self._project_json = {}
+        self._projects_by_id = None
+        self._encoded = {}
+
+    @property
+    def etag(self) -> str:
+        """Strong validator built from updated_at and a hash of the document content"""
+        if self._etag is None:
+            content = {k: v for k, v in self.document.items() if k != "_id"}
+            digest = hashlib.sha256(
+                json.dumps(content, sort_keys=True, default=str).encode()
+            ).hexdigest()[:20]
+            updated_at = self.document.get("updated_at")
+            stamp = int(updated_at.timestamp() * 1000) if isinstance(updated_at, datetime) else 0
+            self._etag = f'"{stamp:x}-{digest}"'
+        return self._etag
+
+    def find_project(self, project_id: str) -> Optional[dict]:
+        if self._projects_by_id is None:
+            self._projects_by_id = {project["id"]: project for project in self.document.get("projects", [])}
+        return self._projects_by_id.get(project_id)
+
+    # Serialized snapshots are built on first use and reused until the entry is replaced
+
+    @property
+    def portfolio_json(self) -> bytes:
+        if self._portfolio_json is None:
+            self._portfolio_json = Portfolio(**self.document).model_dump_json().encode()
+        return self._portfolio_json
+
+    @property
+    def projects_json(self) -> bytes:
+        if self._projects_json is None:
+            projects = [Project(**project) for project in self.document.get("projects", [])]
+            self._projects_json = _project_list_adapter.dump_json(projects)
+        return self._projects_json
+
+    async def encoded(self, key: str, body: bytes, encoding: str) -> bytes:
+        """Compressed copy of a snapshot body, built once per entry and encoding
+
+        Compression runs in a thread; concurrent readers share one task, and the
+        shield keeps a disconnecting client from cancelling it for the others.
+        """
+        task = self._encoded.get((key, encoding))
+        if task is None:
+            task = asyncio.ensure_future(asyncio.to_thread(compress_max, body, encoding))
+            self._encoded[(key, encoding)] = task
+        try:
+            return await asyncio.shield(task)
+        except Exception:
+            self._encoded.pop((key, encoding), None)
+            raise
+
+    def project_json(self, project_id: str) -> Optional[bytes]:
+        if project_id not in self._project_json:
+            project = self.find_project(project_id)
+            if project is None:
+                return None
+            self._project_json[project_id] = Project(**project).model_dump_json().encode()
+        return self._project_json[project_id]
+
+
+class PortfolioCache:
+    """Read-through cache for the active portfolio document"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entry = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _fresh(self) -> bool:
+        return self._entry is not None and time.monotonic() < self._expires_at
+
+    async def get(self) -> Optional[PortfolioEntry]:
+        """Return the active portfolio entry, loading it from storage on a miss"""
+        if not self.enabled:
+            self.misses += 1
+            document = await storage.portfolios.get_active()
+            return PortfolioEntry(document) if document else None
+
+        if self._fresh():
+            self.hits += 1
+            return self._entry
+
+        async with self._lock:
+            # Another request may have refilled the cache while we waited
+            if self._fresh():
+                self.hits += 1
+                return self._entry
+
+            self.misses += 1
+            generation = self._generation
+            document = await storage.portfolios.get_active()
+            if document is None:
+                return None
+            entry = PortfolioEntry(document)
+            # Don't store a document that a concurrent write has already outdated
+            if generation == self._generation:
+                self._entry = entry
+                self._expires_at = time.monotonic() + self.ttl
+            return entry
+
+    def invalidate(self):
+        """Drop the cached entry so the next read goes back to storage"""
+        self._generation += 1
+        self._entry = None
+        self._expires_at = 0.0
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "ttl_seconds": self.ttl,
+            "cached": self._fresh(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# Cached copy of the active portfolio, shared by all read endpoints
+portfolio_cache = PortfolioCache(ttl=float(os.environ.get("PORTFOLIO_CACHE_TTL", "60")))
+
+
+# HTTP caching policy for portfolio reads
+CACHE_MAX_AGE = int(os.environ.get("PORTFOLIO_CACHE_MAX_AGE", "60"))
+STALE_WHILE_REVALIDATE = int(os.environ.get("PORTFOLIO_STALE_WHILE_REVALIDATE", "300"))
+CACHE_CONTROL = f"public, max-age={CACHE_MAX_AGE}, stale-while-revalidate={STALE_WHILE_REVALIDATE}"
+
+# Smaller bodies aren't worth compressing
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+
+# Opt-in static publishing: rendered JSON on disk, served as files (or by nginx)
+PUBLISH_DIR = os.environ.get("PORTFOLIO_PUBLISH_DIR")
+publisher = SnapshotPublisher(
+    PUBLISH_DIR,
+    keep=int(os.environ.get("PORTFOLIO_PUBLISH_KEEP", "3")),
+    min_compress_size=COMPRESSION_MIN_SIZE
+) if PUBLISH_DIR else None
+_publish_lock = asyncio.Lock()
+
+# Project files of the last publish, so a write only re-renders the projects it touched
+_published_projects = {"version": None, "bodies": {}}
+
+
+def _follows(previous_version: Optional[int], entry: PortfolioEntry) -> bool:
+    """Whether entry is the very next version after previous_version
+
+    Each write bumps the version once, so one step ahead means nothing was missed
+    and derived state can be patched with just that write's changes.
+    """
+    return previous_version is not None and previous_version == entry.document.get("version", 0) - 1
+
+
+def _project_files(entry: PortfolioEntry, change: Optional[str], ids: Optional[List[str]]) -> dict:
+    if change in _PROJECT_CHANGES and _follows(_published_projects["version"], entry):
+        bodies = dict(_published_projects["bodies"])
+        for project_id in ids or []:
+            bodies.pop(project_id, None)
+            if entry.find_project(project_id) is not None and safe_name(project_id):
+                bodies[project_id] = entry.project_json(project_id)
+    else:
+        bodies = {
+            project["id"]: entry.project_json(project["id"])
+            for project in entry.document.get("projects", []) if safe_name(project["id"])
+        }
+    return bodies
+
+
+async def publish_snapshot(change: Optional[str] = None, ids: Optional[List[str]] = None):
+    """Render the active portfolio and its projects to the publish directory"""
+    if publisher is None:
+        return
+    async with _publish_lock:
+        try:
+            entry = await portfolio_cache.get()
+            if entry is None:
+                publisher.withdraw()
+                _published_projects.update(version=None, bodies={})
+                return
+            bodies = _project_files(entry, change, ids)
+            files = {"portfolio.json": entry.portfolio_json, "projects.json": entry.projects_json}
+            files.update((f"projects/{project_id}.json", body) for project_id, body in bodies.items())
+            digest = entry.etag.strip('"').split("-")[-1]
+            version = entry.document.get("version", 0)
+            await asyncio.to_thread(publisher.publish, f"v{version}-{digest}", entry.etag, files)
+            _published_projects.update(version=version, bodies=bodies)
+        except Exception:
+            # Reads fall back to storage rather than serving a stale version
+            logger.exception("Failed to publish portfolio snapshot")
+            publisher.withdraw()
+            _published_projects.update(version=None, bodies={})
+
+
+# Change notices for /portfolio/events subscribers
+portfolio_events = EventBroadcaster(
+    max_queue=int(os.environ.get("EVENTS_QUEUE_SIZE", "16")),
+    heartbeat=float(os.environ.get("EVENTS_HEARTBEAT", "15")),
+    retry=float(os.environ.get("EVENTS_RETRY", "1"))
+)
+
+# Follow other workers' writes through a change stream when storage offers one
+EVENTS_CHANGE_STREAM = os.environ.get("EVENTS_CHANGE_STREAM", "true").lower() in ("1", "true", "yes")
+_change_listener = None
+
+
+# Indexes derived from the active portfolio's projects
+project_index = ProjectSearchIndex()
+technology_facets = TechnologyFacets()
+
+# Writes that only touch the projects they list; anything else rebuilds the indexes
+_PROJECT_CHANGES = {"project.created", "project.updated", "projects.upserted", "project.deleted", "projects.deleted"}
+
+
+def _rebuild_indexes(document: Optional[dict]):
+    document = document or {}
+    projects = document.get("projects", [])
+    version = document.get("version", 0) if document else None
+    project_index.rebuild(projects, version)
+    technology_facets.rebuild(projects, version, document.get("tech_stack"))
+
+
+def _sync_indexes(entry: Optional[PortfolioEntry], change: str, ids: Optional[List[str]]):
+    if entry is None:
+        _rebuild_indexes(None)
+        return
+    version = entry.document.get("version", 0)
+    if (change in _PROJECT_CHANGES and _follows(project_index.version, entry)
+            and _follows(technology_facets.version, entry)):
+        for index in (project_index, technology_facets):
+            for project_id in ids or []:
+                project = entry.find_project(project_id)
+                if project is None:
+                    index.remove(project_id)
+                else:
+                    index.put(project)
+            index.version = version
+    else:
+        _rebuild_indexes(entry.document)
+
+
+async def _current_indexes():
+    """Make sure the derived indexes match the current portfolio version"""
+    if portfolio_cache.enabled:
+        # A cache hit costs nothing; the indexes are only rebuilt when the version moved
+        entry = await get_active_portfolio()
+        version = entry.document.get("version", 0)
+        if project_index.version != version or technology_facets.version != version:
+            _rebuild_indexes(entry.document)
+    else:
+        # Other workers' writes only show up in storage, so check the version every time
+        version = await storage.portfolios.version()
+        if version is not None and project_index.version == version and technology_facets.version == version:
+            return
+        document = await storage.portfolios.get_active()
+        if document is None:
+            raise HTTPException(status_code=404, detail="Portfolio not found")
+        _rebuild_indexes(document)
+
+
+def _version_notice(entry: PortfolioEntry) -> dict:
+    return {"version": entry.document.get("version", 0), "etag": entry.etag}
+
+
+async def portfolio_changed(change: str, ids: Optional[List[str]] = None):
+    """After a write: invalidate cached reads, republish the static snapshot and notify subscribers"""
+    portfolio_cache.invalidate()
+    await publish_snapshot(change, ids)
+    entry = await portfolio_cache.get()
+    _sync_indexes(entry, change, ids)
+    notice = {"type": change}
+    if ids is not None:
+        notice["ids"] = ids
+    if entry is not None:
+        notice.update(_version_notice(entry))
+    portfolio_events.publish(notice)
+
+
+async def _listen_for_changes(changes):
+    try:
+        async for version in changes:
+            # Writes from this worker were already announced; only others' get through
+            if portfolio_events.publish({"type": "portfolio.changed", "version": version}, dedupe=True):
+                portfolio_cache.invalidate()
+                project_index.version = technology_facets.version = None
+    except asyncio.CancelledError:
+        raise
+    except Exception as exc:
+        logger.warning("Change stream unavailable (%s); portfolio events are local to this worker", exc)
+
+
+def start_change_listener():
+    global _change_listener
+    if not EVENTS_CHANGE_STREAM:
+        return
+    changes = storage.watch_versions()
+    if changes is not None:
+        _change_listener = asyncio.create_task(_listen_for_changes(changes))
+
+
+async def stop_change_listener():
+    global _change_listener
+    portfolio_events.close()
+    if _change_listener is not None:
+        _change_listener.cancel()
+        try:
+            await _change_listener
+        except asyncio.CancelledError:
+            pass
+        _change_listener = None
+
+
+async def get_active_portfolio() -> PortfolioEntry:
+    """Get the active portfolio entry through the cache
+
+    The entry's document is shared between requests and must not be mutated.
+    """
+    entry = await portfolio_cache.get()
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+    return entry
+
+
+async def get_portfolio_projects(project_id: Optional[str] = None) -> PortfolioEntry:
+    """Get an entry holding just the projects a project read needs
+
+    With the cache on, the shared full document is used. Otherwise only the
+    projects (or the single matching project) are fetched from storage.
+    """
+    if portfolio_cache.enabled:
+        return await get_active_portfolio()
+
+    document = await storage.projects.load(project_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+    return PortfolioEntry(document)
+
+
+def _cache_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+
+
+def _variant_etag(etag: str, encoding: Optional[str]) -> str:
+    """Each content coding is a different representation, so it gets its own strong ETag"""
+    return etag if encoding is None else f'{etag[:-1]}-{encoding}"'
+
 
-def init_db(database):
-    global db
-    db = database
+def _is_not_modified(request: Request, etag: str) -> bool:
+    """Check If-None-Match against our ETag (weak comparison, per RFC 9110)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=_cache_headers(etag))
+
+
+def _published_read(request: Request, name: str) -> Optional[Response]:
+    """Answer a read straight from the published files, or None if they don't have it"""
+    if publisher is None:
+        return None
+    snapshot = publisher.current()
+    if snapshot is None or snapshot.file(name) is None:
+        return None
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    if encoding is not None and snapshot.file(name, encoding) is None:
+        encoding = None
+    etag = _variant_etag(snapshot.etag, encoding)
+    if _is_not_modified(request, etag):
+        return _not_modified(etag)
+    
+    headers = _cache_headers(etag)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return FileResponse(snapshot.file(name, encoding), media_type="application/json", headers=headers)
+
+
+async def _cached_read(request: Request, response: Response, entry: PortfolioEntry, key: str, serialize) -> Optional[Response]:
+    """Answer a read from validators and snapshots
+
+    Returns a 304 or a (possibly precompressed) snapshot response, or None when
+    snapshots are off and the caller should return the model instead.
+    """
+    negotiated = negotiate_encoding(request.headers.get("accept-encoding", "")) if SNAPSHOTS_ENABLED else None
+    # Validate before serializing: the client may hold the compressed variant's tag,
+    # or the plain one if the body was too small to compress
+    for candidate in dict.fromkeys((negotiated, None)):
+        etag = _variant_etag(entry.etag, candidate)
+        if _is_not_modified(request, etag):
+            return _not_modified(etag)
+    if not SNAPSHOTS_ENABLED:
+        response.headers.update(_cache_headers(entry.etag))
+        return None
+    
+    body = serialize()
+    encoding = negotiated if len(body) >= COMPRESSION_MIN_SIZE else None
+    etag = _variant_etag(entry.etag, encoding)
+    headers = _cache_headers(etag)
+    if encoding:
+        body = await entry.encoded(key, body, encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @router.get("/portfolio", response_model=Portfolio)
-async def get_portfolio():
+async def get_portfolio(request: Request, response: Response):
     """Get the main portfolio data"""
-    portfolio = await db.portfolio.find_one({"active": True})
-    if not portfolio:
-        raise HTTPException(status_code=404, detail="Portfolio not found")
-    return Portfolio(**portfolio)
+    published = _published_read(request, "portfolio.json")
+    if published is not None:
+        return published
+    entry = await get_active_portfolio()
+    cached = await _cached_read(request, response, entry, "portfolio", lambda: entry.portfolio_json)
+    if cached is not None:
+        return cached
+    return Portfolio(**entry.document)
+
+def _new_projects(projects: List[dict]) -> List[dict]:
+    return [Project(**project).dict() for project in projects]
 
 @router.post("/portfolio", response_model=Portfolio)
 async def create_portfolio(portfolio_data: PortfolioCreate):
     """Create or update portfolio data"""
     # Check if portfolio already exists
-    existing_portfolio = await db.portfolio.find_one({"active": True})
-    
-    if existing_portfolio:
+    if await storage.portfolios.exists():
         # Update existing portfolio
         portfolio_dict = portfolio_data.dict()
+        portfolio_dict["projects"] = _new_projects(portfolio_dict["projects"])
         portfolio_dict["updated_at"] = datetime.utcnow()
-        await db.portfolio.update_one(
-            {"active": True},
-            {"$set": portfolio_dict}
-        )
-        updated_portfolio = await db.portfolio.find_one({"active": True})
+        await storage.portfolios.update(portfolio_dict)
+        await portfolio_changed("portfolio.updated")
+        updated_portfolio = await storage.portfolios.get_active()
         return Portfolio(**updated_portfolio)
     else:
         # Create new portfolio
         portfolio_dict = portfolio_data.dict()
         portfolio_obj = Portfolio(**portfolio_dict)
-        portfolio_obj.active = True
-        await db.portfolio.insert_one(portfolio_obj.dict())
+        await storage.portfolios.create({**portfolio_obj.dict(), "active": True})
+        await portfolio_changed("portfolio.created")
         return portfolio_obj
 
 @router.put("/portfolio", response_model=Portfolio)
 async def update_portfolio(portfolio_update: PortfolioUpdate):
     """Update specific parts of portfolio"""
-    existing_portfolio = await db.portfolio.find_one({"active": True})
-    if not existing_portfolio:
+    if not await storage.portfolios.exists():
         raise HTTPException(status_code=404, detail="Portfolio not found")
     
     update_data = portfolio_update.dict(exclude_unset=True)
     if update_data:
         update_data["updated_at"] = datetime.utcnow()
-        await db.portfolio.update_one(
-            {"active": True},
-            {"$set": update_data}
-        )
+        await storage.portfolios.update(update_data)
+        await portfolio_changed("portfolio.updated")
     
-    updated_portfolio = await db.portfolio.find_one({"active": True})
+    updated_portfolio = await storage.portfolios.get_active()
     return Portfolio(**updated_portfolio)
 
 @router.get("/projects", response_model=List[Project])
-async def get_projects():
-    """Get all projects"""
-    portfolio = await db.portfolio.find_one({"active": True})
-    if not portfolio:
-        raise HTTPException(status_code=404, detail="Portfolio not found")
-    return [Project(**project) for project in portfolio.get("projects", [])]
+async def get_projects(
+    request: Request,
+    response: Response,
+    featured: Optional[bool] = None,
+    technology: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    cursor: Optional[str] = None
+):
+    """Get projects, optionally filtered and paginated (oldest first)
+
+    When more results exist, the cursor for the next page is sent in X-Next-Cursor.
+    """
+    filtered = featured is not None or technology is not None or limit is not None or cursor
+    if not filtered:
+        published = _published_read(request, "projects.json")
+        if published is not None:
+            return published
+    if filtered and storage.projects.indexed:
+        # The indexed collection only reads the requested page
+        try:
+            page, next_cursor = await storage.projects.list_page(featured, technology, limit, cursor)
+        except InvalidCursor as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return [Project(**project) for project in page]
+
+    entry = await get_portfolio_projects()
+    if not filtered:
+        cached = await _cached_read(request, response, entry, "projects", lambda: entry.projects_json)
+        if cached is not None:
+            return cached
+        return [Project(**project) for project in entry.document.get("projects", [])]
+
+    if _is_not_modified(request, entry.etag):
+        return _not_modified(entry.etag)
+    try:
+        page, next_cursor = filter_projects(
+            entry.document.get("projects", []), featured, technology, limit, cursor
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    response.headers.update(_cache_headers(entry.etag))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [Project(**project) for project in page]
+
+@router.get("/projects/search", response_model=List[ProjectSearchHit])
+async def search_projects(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Search projects by name, description, details and technologies, best match first"""
+    await _current_indexes()
+    return [
+        ProjectSearchHit(**project_index.get(project_id), score=score)
+        for project_id, score in project_index.search(q, limit)
+    ]
+
+@router.get("/technologies", response_model=List[TechnologyFacet])
+async def get_technologies():
+    """Get technologies used across projects and the tech stack, with project counts"""
+    await _current_indexes()
+    # Serialized once per change, so this is a plain bytes response
+    return Response(
+        content=technology_facets.json(),
+        media_type="application/json",
+        headers={"Cache-Control": CACHE_CONTROL}
+    )
+
+async def _idempotent(scope: str, key: Optional[str], payload: dict, response: Response, write):
+    """Run write once per Idempotency-Key, replaying its stored response for retries"""
+    if key is None:
+        return await write()
+    fingerprint = hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+    try:
+        result, replayed = await idempotency_store.run(f"{scope}:{key}", fingerprint, write)
+    except IdempotencyKeyReused:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+    except IdempotencyKeyInProgress:
+        raise HTTPException(
+            status_code=409,
+            detail="A request with this Idempotency-Key is still in progress",
+            headers={"Retry-After": "1"}
+        )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
 
 @router.post("/projects", response_model=Project)
-async def create_project(project_data: ProjectCreate):
+async def create_project(
+    project_data: ProjectCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, min_length=1, max_length=255)
+):
     """Add a new project to portfolio"""
-    portfolio = await db.portfolio.find_one({"active": True})
-    if not portfolio:
+    async def write():
+        project_obj = Project(**project_data.dict())
+        if not await storage.projects.insert(project_obj.dict()):
+            raise HTTPException(status_code=404, detail="Portfolio not found")
+        await portfolio_changed("project.created", [project_obj.id])
+        return project_obj.dict()
+
+    return await _idempotent("projects", idempotency_key, project_data.dict(), response, write)
+
+def _check_bulk_size(items: list):
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} items per bulk request")
+
+@router.post("/projects/bulk", response_model=BulkResult)
+async def bulk_upsert_projects(projects_data: List[ProjectUpsert]):
+    """Create or update many projects at once; items with a known id are updated"""
+    _check_bulk_size(projects_data)
+    projects = []
+    for item in projects_data:
+        data = item.dict(exclude={"id"})
+        if item.id:
+            data["id"] = item.id
+        projects.append(Project(**data).dict())
+    
+    statuses = await storage.projects.bulk_upsert(projects)
+    if statuses is None:
         raise HTTPException(status_code=404, detail="Portfolio not found")
+    await portfolio_changed("projects.upserted", [project["id"] for project in projects])
     
-    project_obj = Project(**project_data.dict())
-    await db.portfolio.update_one(
-        {"active": True},
-        {"$push": {"projects": project_obj.dict()}}
-    )
-    return project_obj
+    return BulkResult(results=[
+        BulkItemResult(id=project["id"], status=status)
+        for project, status in zip(projects, statuses)
+    ])
 
-@router.get("/projects/{project_id}", response_model=Project)
-async def get_project(project_id: str):
-    """Get a specific project"""
-    portfolio = await db.portfolio.find_one({"active": True})
-    if not portfolio:
+@router.post("/projects/bulk-delete", response_model=BulkResult)
+async def bulk_delete_projects(request_data: BulkIds):
+    """Delete many projects at once"""
+    _check_bulk_size(request_data.ids)
+    deleted = await storage.projects.bulk_delete(request_data.ids)
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Portfolio not found")
+    if deleted:
+        await portfolio_changed("projects.deleted", sorted(deleted))
     
-    for project in portfolio.get("projects", []):
-        if project["id"] == project_id:
-            return Project(**project)
+    return BulkResult(results=[
+        BulkItemResult(id=project_id, status="deleted" if project_id in deleted else "not_found")
+        for project_id in request_data.ids
+    ])
+
+@router.get("/projects/{project_id}", response_model=Project)
+async def get_project(project_id: str, request: Request, response: Response):
+    """Get a specific project"""
+    if safe_name(project_id):
+        published = _published_read(request, f"projects/{project_id}.json")
+        if published is not None:
+            return published
+    entry = await get_portfolio_projects(project_id)
+    project = entry.find_project(project_id)
+    if project is None:
+        raise HTTPException(status_code=404, detail="Project not found")
     
-    raise HTTPException(status_code=404, detail="Project not found")
+    cached = await _cached_read(
+        request, response, entry, f"project:{project_id}", lambda: entry.project_json(project_id)
+    )
+    if cached is not None:
+        return cached
+    return Project(**project)
 
-@router.put("/projects/{project_id}", response_model=Project)
-async def update_project(project_id: str, project_update: ProjectCreate):
-    """Update a specific project"""
-    portfolio = await db.portfolio.find_one({"active": True})
+async def _raise_write_conflict(project_id: str, version: Optional[int]):
+    """Explain why a targeted project write matched nothing"""
+    portfolio = await storage.projects.load(project_id)
     if not portfolio:
         raise HTTPException(status_code=404, detail="Portfolio not found")
-    
-    projects = portfolio.get("projects", [])
-    project_index = None
-    for i, project in enumerate(projects):
-        if project["id"] == project_id:
-            project_index = i
-            break
-    
-    if project_index is None:
+    if not portfolio.get("projects"):
         raise HTTPException(status_code=404, detail="Project not found")
-    
-    # Update the project
-    updated_project = Project(**project_update.dict())
-    updated_project.id = project_id
-    projects[project_index] = updated_project.dict()
-    
-    await db.portfolio.update_one(
-        {"active": True},
-        {"$set": {"projects": projects}}
+    raise HTTPException(
+        status_code=409,
+        detail=f"Portfolio has changed (expected version {version}, current version {portfolio.get('version', 0)})"
     )
+
+@router.put("/projects/{project_id}", response_model=Project)
+async def update_project(project_id: str, project_update: ProjectCreate, version: Optional[int] = None):
+    """Update a specific project"""
+    project = await storage.projects.update(project_id, project_update.dict(), version)
+    if project is None:
+        await _raise_write_conflict(project_id, version)
+    await portfolio_changed("project.updated", [project_id])
     
-    return updated_project
+    return Project(**project)
 
 @router.delete("/projects/{project_id}")
-async def delete_project(project_id: str):
+async def delete_project(project_id: str, version: Optional[int] = None):
     """Delete a specific project"""
-    portfolio = await db.portfolio.find_one({"active": True})
-    if not portfolio:
-        raise HTTPException(status_code=404, detail="Portfolio not found")
-    
-    projects = portfolio.get("projects", [])
-    updated_projects = [p for p in projects if p["id"] != project_id]
-    
-    if len(updated_projects) == len(projects):
-        raise HTTPException(status_code=404, detail="Project not found")
-    
-    await db.portfolio.update_one(
-        {"active": True},
-        {"$set": {"projects": updated_projects}}
-    )
+    if not await storage.projects.delete(project_id, version):
+        await _raise_write_conflict(project_id, version)
+    await portfolio_changed("project.deleted", [project_id])
     
     return {"message": "Project deleted successfully"}
 
-@router.post("/contact", response_model=ContactMessage)
-async def send_contact_message(message_data: ContactMessageCreate):
+@router.get("/portfolio/events")
+async def stream_portfolio_events():
+    """Stream portfolio change notices as Server-Sent Events
+
+    Each event carries the new portfolio version; the first one on connect is
+    the current version, so reconnecting clients can tell whether they missed anything.
+    """
+    entry = await portfolio_cache.get()
+    initial = {"type": "portfolio.current", **_version_notice(entry)} if entry is not None else None
+    queue = portfolio_events.subscribe()
+    return StreamingResponse(
+        portfolio_events.stream(queue, initial),
+        media_type="text/event-stream",
+        # Proxies must pass events through as they are written
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/portfolio/cache-stats")
+async def get_portfolio_cache_stats():
+    """Get hit/miss counters for the portfolio cache (admin only)"""
+    return portfolio_cache.stats()
+
+@router.post("/contact", response_model=ContactMessage, dependencies=[Depends(rate_limit(contact_rate_limiter))])
+async def send_contact_message(
+    message_data: ContactMessageCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, min_length=1, max_length=255)
+):
     """Send a contact message"""
-    message_obj = ContactMessage(**message_data.dict())
-    await db.contact_messages.insert_one(message_obj.dict())
-    return message_obj
+    async def write():
+        message_obj = ContactMessage(**message_data.dict())
+        if message_writer is not None:
+            try:
+                message_writer.submit(message_obj.dict())
+            except QueueFull:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Too many messages right now, please try again shortly",
+                    headers={"Retry-After": "1"}
+                )
+        else:
+            await storage.messages.insert(message_obj.dict())
+        return message_obj.dict()
+
+    return await _idempotent("contact", idempotency_key, message_data.dict(), response, write)
 
 @router.get("/contact-messages", response_model=List[ContactMessage])
-async def get_contact_messages():
-    """Get all contact messages (admin only)"""
-    messages = await db.contact_messages.find().sort("created_at", -1).to_list(100)
-    return [ContactMessage(**message) for message in messages]
+async def get_contact_messages(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    after: Optional[str] = None,
+    replied: Optional[bool] = None
+):
+    """Get contact messages, newest first (admin only)
+
+    When more messages exist, the cursor for the next page is sent in X-Next-Cursor.
+    """
+    try:
+        page, next_cursor = await storage.messages.list_page(limit, after, replied)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [ContactMessage(**message) for message in page]
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Stored timestamps are naive UTC, so an offset in the query is converted away"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+@router.get("/contact-messages/export")
+async def export_contact_messages(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    gzip: bool = False
+):
+    """Stream contact messages oldest first as NDJSON or CSV (admin only)"""
+    # Messages are pulled from storage as the response is sent
+    messages = storage.messages.export(_naive_utc(since), _naive_utc(until))
+    body = ndjson_lines(messages) if format == "ndjson" else csv_lines(messages)
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+    filename = f"contact-messages.{format}"
+    headers = {}
+    if gzip:
+        body = gzip_stream(body)
+        media_type = "application/gzip"
+        filename += ".gz"
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
+@router.put("/contact-messages/replied", response_model=BulkResult)
+async def mark_messages_replied(request_data: BulkIds):
+    """Mark many messages as replied"""
+    _check_bulk_size(request_data.ids)
+    found_ids = await storage.messages.mark_replied(request_data.ids)
+    
+    return BulkResult(results=[
+        BulkItemResult(id=message_id, status="replied" if message_id in found_ids else "not_found")
+        for message_id in request_data.ids
+    ])
 
 @router.put("/contact-messages/{message_id}/replied")
 async def mark_message_replied(message_id: str):
     """Mark a message as replied"""
-    result = await db.contact_messages.update_one(
-        {"id": message_id},
-        {"$set": {"replied": True}}
-    )
-    
-    if result.matched_count == 0:
+    if not await storage.messages.mark_one_replied(message_id):
         raise HTTPException(status_code=404, detail="Message not found")
     
     return {"message": "Message marked as replied"}
\ No newline at end of file
@@ -1,32 +1,60 @@
 from fastapi import FastAPI, APIRouter
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from contextlib import asynccontextmanager
+from services.compression import CompressionMiddleware
+from services.metrics import PrometheusMiddleware
 import os
 import logging
+import time
 from pathlib import Path
 from datetime import datetime
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Storage backend: "mongo" (default) or "memory" for single-node deployments
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'mongo')
+
+def create_storage(backend: str):
+    if backend == 'memory':
+        from repositories.memory import MemoryStorage
+        return MemoryStorage(
+            snapshot_path=os.environ.get('MEMORY_SNAPSHOT_PATH'),
+            snapshot_interval=float(os.environ.get('MEMORY_SNAPSHOT_INTERVAL', '5'))
+        )
+    if backend == 'mongo':
+        from motor.motor_asyncio import AsyncIOMotorClient
+        from repositories.mongo import MongoStorage
+        from services.db_monitor import PoolMonitor
+        from services.metrics import MongoCommandMetrics
+        mongo_min_pool_size = int(os.environ.get('MONGO_MIN_POOL_SIZE', '5'))
+        pool_monitor = PoolMonitor()
+        client = AsyncIOMotorClient(
+            os.environ['MONGO_URL'],
+            minPoolSize=mongo_min_pool_size,
+            event_listeners=[pool_monitor, MongoCommandMetrics()]
+        )
+        return MongoStorage(client, client[os.environ['DB_NAME']], pool_monitor, mongo_min_pool_size)
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
+
+storage = create_storage(STORAGE_BACKEND)
 
 # Create the main app without a prefix
-app = FastAPI(title="Nishant Portfolio API", version="1.0.0")
+# orjson renders responses natively (datetimes, UUIDs) and much faster than stdlib json
+app = FastAPI(title="Nishant Portfolio API", version="1.0.0", default_response_class=ORJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
-# Import routes after database is initialized
-from routes import portfolio, init_data
+# Import routes after storage is initialized
+from routes import portfolio, init_data, health, images
 
-# Initialize database connections in route modules
-portfolio.init_db(db)
-init_data.init_db(db)
+# Initialize storage in route modules
+portfolio.init_storage(storage)
+init_data.init_storage(storage)
+health.init_storage(storage)
 
 # Add your routes to the router
 @api_router.get("/")
@@ -36,16 +64,24 @@ async def root():
 # Include route modules
 api_router.include_router(portfolio.router, tags=["portfolio"])
 api_router.include_router(init_data.router, tags=["initialization"])
+api_router.include_router(health.router, tags=["health"])
+api_router.include_router(images.router, tags=["images"])
 
 # Include the router in the main app
 app.include_router(api_router)
 
+app.add_middleware(CompressionMiddleware, minimum_size=int(os.environ.get('COMPRESSION_MIN_SIZE', '1024')))
+
+app.add_middleware(PrometheusMiddleware, metrics_path=os.environ.get('METRICS_PATH', '/metrics'))
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    # Browsers only let cross-origin scripts read listed headers
+    expose_headers=["X-Next-Cursor", "Idempotent-Replayed"],
 )
 
 # Configure logging
@@ -55,11 +91,35 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def timed_step(name: str):
+    started = time.perf_counter()
+    yield
+    logger.info("Startup: %s took %.1f ms", name, (time.perf_counter() - started) * 1000)
+
 @app.on_event("startup")
 async def startup_event():
+    # Do the cold work here so the first visitor after a deploy doesn't pay for it
+    async with timed_step(f"{storage.name} storage start"):
+        await storage.start()
+    async with timed_step("index bootstrap"):
+        await storage.ensure_indexes()
+    async with timed_step("portfolio cache prewarm"):
+        await portfolio.portfolio_cache.get()
+    if portfolio.publisher is not None:
+        async with timed_step("snapshot publish"):
+            await portfolio.publish_snapshot()
+    if portfolio.message_writer is not None:
+        portfolio.message_writer.start()
+    portfolio.start_change_listener()
     logger.info("Portfolio API server started successfully")
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
-    logger.info("Database connection closed")
\ No newline at end of file
+    # End open event streams so they don't hold the shutdown
+    await portfolio.stop_change_listener()
+    if portfolio.message_writer is not None:
+        # Flush buffered contact messages before the connection goes away
+        await portfolio.message_writer.close()
+    await storage.close()
+    logger.info("Storage closed")
\ No newline at end of file
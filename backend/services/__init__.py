@@ -0,0 +1 @@
+# Services package for portfolio API
\ No newline at end of file
@@ -0,0 +1,81 @@
+from collections import deque
+from pymongo import monitoring
+import threading
+import time
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Tracks connection pool usage and checkout wait times from pymongo CMAP events
+
+    Motor runs pymongo on executor threads, so checkout start/finish pairs are
+    matched per thread.
+    """
+
+    def __init__(self, window_seconds: float = 60.0, max_samples: int = 1000):
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._waits = deque(maxlen=max_samples)
+        self.open_connections = 0
+        self.in_use = 0
+        self.checkout_failures = 0
+
+    def _finish_checkout(self):
+        started = getattr(self._local, "checkout_started", None)
+        self._local.checkout_started = None
+        return None if started is None else time.perf_counter() - started
+
+    def connection_check_out_started(self, event):
+        self._local.checkout_started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        wait = self._finish_checkout()
+        with self._lock:
+            self.in_use += 1
+            if wait is not None:
+                self._waits.append((time.monotonic(), wait))
+
+    def connection_check_out_failed(self, event):
+        self._finish_checkout()
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use = max(self.in_use - 1, 0)
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections = max(self.open_connections - 1, 0)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def stats(self) -> dict:
+        cutoff = time.monotonic() - self.window_seconds
+        with self._lock:
+            waits = [wait for at, wait in self._waits if at >= cutoff]
+            stats = {
+                "open_connections": self.open_connections,
+                "in_use": self.in_use,
+                "checkout_failures": self.checkout_failures,
+            }
+        stats["checkout_wait_ms_avg"] = round(sum(waits) / len(waits) * 1000, 3) if waits else 0.0
+        stats["checkout_wait_ms_max"] = round(max(waits) * 1000, 3) if waits else 0.0
+        return stats
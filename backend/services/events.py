@@ -0,0 +1,101 @@
+from typing import AsyncIterator, Optional
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+_CLOSED = object()
+
+
+class EventBroadcaster:
+    """Fans events out to every connected subscriber through bounded queues
+
+    A subscriber that falls max_queue events behind is disconnected rather than
+    allowed to hold memory; EventSource clients reconnect on their own and
+    catch up from the version sent on connect.
+    """
+
+    def __init__(self, max_queue: int = 16, heartbeat: float = 15.0, retry: float = 1.0):
+        self.max_queue = max_queue
+        self.heartbeat = heartbeat
+        self.retry = retry
+        self.last_version = None
+        self.published = 0
+        self.disconnected = 0
+        self._queues = set()
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.max_queue)
+        self._queues.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._queues.discard(queue)
+
+    def publish(self, event: dict, dedupe: bool = False) -> bool:
+        """Queue an event for every subscriber
+
+        With dedupe, versions already announced are skipped (a change stream
+        echoes this worker's own writes after they were announced locally).
+        """
+        version = event.get("version")
+        if dedupe and version is not None and self.last_version is not None and version <= self.last_version:
+            return False
+        if version is not None:
+            self.last_version = version
+        self.published += 1
+        for queue in list(self._queues):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.disconnected += 1
+                self._disconnect(queue)
+        return True
+
+    def close(self):
+        """End every open stream, e.g. on shutdown"""
+        for queue in list(self._queues):
+            self._disconnect(queue)
+
+    def _disconnect(self, queue: asyncio.Queue):
+        self._queues.discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(_CLOSED)
+
+    async def stream(self, queue: asyncio.Queue, initial: Optional[dict] = None) -> AsyncIterator[bytes]:
+        """Encode a subscription as text/event-stream, with comment heartbeats when idle"""
+        try:
+            # How soon EventSource reconnects after a disconnect or a restart
+            yield f"retry: {int(self.retry * 1000)}\n\n".encode()
+            if initial is not None:
+                yield format_event(initial)
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from timing out the idle connection
+                    yield b": heartbeat\n\n"
+                    continue
+                if event is _CLOSED:
+                    return
+                yield format_event(event)
+        finally:
+            self.unsubscribe(queue)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._queues),
+            "published": self.published,
+            "disconnected": self.disconnected,
+            "last_version": self.last_version,
+        }
+
+
+def format_event(event: dict, name: str = "portfolio") -> bytes:
+    lines = [f"event: {name}"]
+    if event.get("version") is not None:
+        lines.append(f"id: {event['version']}")
+    lines.append("data: " + json.dumps(event, separators=(",", ":"), default=str))
+    return ("\n".join(lines) + "\n\n").encode()
@@ -0,0 +1,54 @@
+from typing import AsyncIterator, List
+from datetime import datetime
+import csv
+import io
+import json
+import zlib
+
+MESSAGE_FIELDS = ["id", "name", "email", "message", "created_at", "replied"]
+
+# Spreadsheets run cells starting with these as formulas (CSV injection)
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+async def ndjson_lines(cursor) -> AsyncIterator[bytes]:
+    async for document in cursor:
+        yield json.dumps(document, default=_json_default, ensure_ascii=False).encode() + b"\n"
+
+
+def _csv_cell(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # Fields come from the public contact form; a leading quote keeps them text
+        return "'" + value
+    return value
+
+
+async def csv_lines(cursor, fields: List[str] = MESSAGE_FIELDS) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    async for document in cursor:
+        writer.writerow([_csv_cell(document.get(field)) for field in fields])
+        # Emit in ~64 KiB chunks rather than one tiny write per row
+        if buffer.tell() >= 65536:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
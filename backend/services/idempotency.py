@@ -0,0 +1,119 @@
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Tuple
+from datetime import datetime, timedelta
+import asyncio
+import copy
+import time
+
+
+class IdempotencyKeyReused(Exception):
+    """The key was already used for a request with a different body"""
+
+
+class IdempotencyKeyInProgress(Exception):
+    """Another worker is still running the request for this key"""
+
+
+class IdempotencyStore:
+    """Remembers the first response per Idempotency-Key for ttl seconds
+
+    Responses live in an LRU table bounded by max_entries. Concurrent
+    duplicates in this worker share one write. With a repository (a Mongo TTL
+    collection), keys are also claimed across workers: a claim expires after
+    pending_timeout if its worker dies mid-write, and once the response is
+    stored it is kept for the full ttl.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 10000, repository=None,
+                 pending_timeout: float = 30.0):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.repository = repository
+        self.pending_timeout = pending_timeout
+        self.stored = 0
+        self.replayed = 0
+        self._entries = OrderedDict()
+        self._inflight = {}
+
+    def _get(self, key: str) -> Optional[Tuple[str, dict]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, fingerprint, response = entry
+        if expires <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return fingerprint, response
+
+    def _put(self, key: str, fingerprint: str, response: dict):
+        self._entries[key] = (time.monotonic() + self.ttl, fingerprint, response)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _replay(self, fingerprint: str, stored_fingerprint: str, response: dict) -> Tuple[dict, bool]:
+        if fingerprint != stored_fingerprint:
+            raise IdempotencyKeyReused()
+        self.replayed += 1
+        return copy.deepcopy(response), True
+
+    async def run(self, key: str, fingerprint: str,
+                  write: Callable[[], Awaitable[dict]]) -> Tuple[dict, bool]:
+        """The response for key, running write only the first time it is seen
+
+        Returns (response, replayed). If write raises, nothing is stored and
+        the key may be retried.
+        """
+        entry = self._get(key)
+        if entry is not None:
+            return self._replay(fingerprint, *entry)
+
+        future = self._inflight.get(key)
+        if future is not None:
+            # A duplicate that arrived while the first request was still running
+            stored_fingerprint, response, _ = await asyncio.shield(future)
+            return self._replay(fingerprint, stored_fingerprint, response)
+
+        # Shielded, so a client that disconnects mid-write still leaves a stored response
+        future = asyncio.ensure_future(self._first(key, fingerprint, write))
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        stored_fingerprint, response, fresh = await asyncio.shield(future)
+        if fresh:
+            return copy.deepcopy(response), False
+        return self._replay(fingerprint, stored_fingerprint, response)
+
+    async def _first(self, key: str, fingerprint: str,
+                     write: Callable[[], Awaitable[dict]]) -> Tuple[str, dict, bool]:
+        if self.repository is not None:
+            now = datetime.utcnow()
+            claimed = await self.repository.claim(key, fingerprint, now + timedelta(seconds=self.pending_timeout))
+            if claimed is not None:
+                if claimed.get("response") is None:
+                    raise IdempotencyKeyInProgress()
+                # Stored by another worker
+                self._put(key, claimed["fingerprint"], claimed["response"])
+                return claimed["fingerprint"], claimed["response"], False
+
+        try:
+            response = await write()
+        except BaseException:
+            if self.repository is not None:
+                await self.repository.release(key)
+            raise
+        self._put(key, fingerprint, response)
+        self.stored += 1
+        if self.repository is not None:
+            await self.repository.complete(key, response, datetime.utcnow() + timedelta(seconds=self.ttl))
+        return fingerprint, response, True
+
+    def stats(self) -> dict:
+        return {
+            "keys": len(self._entries),
+            "inflight": len(self._inflight),
+            "stored": self.stored,
+            "replayed": self.replayed,
+            "shared": self.repository is not None,
+        }
+
@@ -0,0 +1,293 @@
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from pathlib import Path
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import threading
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Pillow is optional; the image endpoints report 503 without it
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Output formats by preference, with their encoder settings
+FORMATS = {
+    "avif": {"mime": "image/avif", "pil": "AVIF", "options": {"quality": 60, "speed": 6}},
+    "webp": {"mime": "image/webp", "pil": "WEBP", "options": {"quality": 80, "method": 4}},
+    "jpeg": {"mime": "image/jpeg", "pil": "JPEG", "options": {"quality": 82, "optimize": True, "progressive": True}},
+}
+
+UPLOAD_TYPES = {"image/jpeg": "jpg", "image/png": "png", "image/webp": "webp", "image/avif": "avif", "image/gif": "gif"}
+
+
+class OriginalsFull(Exception):
+    """Storing another original would exceed the originals quota"""
+
+
+class UnreadableImage(ValueError):
+    """An uploaded body that Pillow can't decode"""
+
+
+def available() -> bool:
+    return Image is not None
+
+
+def supported_formats() -> Tuple[str, ...]:
+    if Image is None:
+        return ()
+    return tuple(name for name in FORMATS if name == "jpeg" or features.check(name))
+
+
+def negotiate_format(accept: str) -> str:
+    """Best output format the client accepts, falling back to JPEG"""
+    accept = accept.lower()
+    for name in supported_formats():
+        if FORMATS[name]["mime"] in accept:
+            return name
+    return "jpeg"
+
+
+def render_variant(original: bytes, width: int, output_format: str) -> bytes:
+    """Resize to at most width pixels wide and re-encode (CPU bound; run in a thread)"""
+    with Image.open(io.BytesIO(original)) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.LANCZOS)
+        spec = FORMATS[output_format]
+        if spec["pil"] == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        elif image.mode not in ("RGB", "RGBA", "L", "LA"):
+            image = image.convert("RGBA")
+        buffer = io.BytesIO()
+        image.save(buffer, spec["pil"], **spec["options"])
+        return buffer.getvalue()
+
+
+def image_size(original: bytes) -> Tuple[int, int]:
+    with Image.open(io.BytesIO(original)) as image:
+        return ImageOps.exif_transpose(image).size
+
+
+class DiskLRUCache:
+    """Size-bounded directory of files, evicting the least recently used
+
+    Recency is kept in memory and mirrored to file mtimes, so a restarted
+    worker picks up where the last one left off. Files are written to a temp
+    name and renamed, so readers never see a partial variant.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._loaded = False
+
+    def _load(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        files = [path for path in self.directory.iterdir() if path.is_file() and not path.name.startswith(".")]
+        for path in sorted(files, key=lambda path: path.stat().st_mtime):
+            size = path.stat().st_size
+            self._entries[path.name] = size
+            self.total_bytes += size
+        self._loaded = True
+
+    def get(self, name: str) -> Optional[Path]:
+        if not self._loaded:
+            self._load()
+        path = self.directory / name
+        if name in self._entries and path.exists():
+            self._entries.move_to_end(name)
+            self.hits += 1
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return path
+        if name in self._entries:
+            # Evicted by another worker sharing the directory
+            self.total_bytes -= self._entries.pop(name)
+        self.misses += 1
+        return None
+
+    def write(self, name: str, body: bytes) -> Path:
+        """Write a file without touching the bookkeeping (safe to run in a thread)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / name
+        temp = self.directory / f".{name}.{os.getpid()}.tmp"
+        temp.write_bytes(body)
+        os.replace(temp, path)
+        return path
+
+    def record(self, name: str, size: int):
+        """Account for a written file and evict until back under max_bytes"""
+        if not self._loaded:
+            self._load()
+        if name in self._entries:
+            self.total_bytes -= self._entries.pop(name)
+        self._entries[name] = size
+        self.total_bytes += size
+        self._evict(keep=name)
+
+    def put(self, name: str, body: bytes) -> Path:
+        path = self.write(name, body)
+        self.record(name, len(body))
+        return path
+
+    def _evict(self, keep: str):
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            name, size = next(iter(self._entries.items()))
+            if name == keep:
+                break
+            del self._entries[name]
+            self.total_bytes -= size
+            self.evictions += 1
+            try:
+                (self.directory / name).unlink()
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "files": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class ImagePipeline:
+    """Originals on disk, resized variants in a DiskLRUCache
+
+    Variant names are a hash of the original's content, the width and the
+    format, so a replaced original never serves stale variants and the URLs
+    that carry its hash can be cached forever.
+    """
+
+    def __init__(self, originals_dir: str, cache: DiskLRUCache, widths: List[int], max_concurrency: int = 2,
+                 max_original_bytes: Optional[int] = None):
+        self.originals_dir = Path(originals_dir)
+        self.cache = cache
+        self.max_original_bytes = max_original_bytes
+        self._original_bytes = None
+        self._originals_lock = threading.Lock()
+        self.widths = sorted(widths)
+        self._hashes = {}
+        self._inflight = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def original_path(self, name: str) -> Optional[Path]:
+        path = self.originals_dir / name
+        return path if path.is_file() else None
+
+    def describe(self, path: Path) -> Tuple[str, int]:
+        """Content hash and pixel width of an original, remembered until it changes on disk"""
+        stat = path.stat()
+        cached = self._hashes.get(path.name)
+        if cached and cached[0] == (stat.st_mtime_ns, stat.st_size):
+            return cached[1]
+        body = path.read_bytes()
+        description = (hashlib.sha256(body).hexdigest()[:16], image_size(body)[0])
+        self._hashes[path.name] = ((stat.st_mtime_ns, stat.st_size), description)
+        return description
+
+    def snap_width(self, width: Optional[int]) -> int:
+        """Round up to a configured width, so arbitrary widths can't fill the cache"""
+        if width is None:
+            return self.widths[-1]
+        for candidate in self.widths:
+            if candidate >= width:
+                return candidate
+        return self.widths[-1]
+
+    def store_original(self, body: bytes, extension: str) -> str:
+        """Save an uploaded original under its content hash and return its name
+
+        Originals are never evicted, so past max_original_bytes new ones are
+        refused with OriginalsFull (re-uploading a stored one still works).
+        """
+        try:
+            image_size(body)
+        except Exception as exc:
+            # The body is only in memory here, so any failure is a decoding one
+            raise UnreadableImage(str(exc)) from exc
+        name = f"{hashlib.sha256(body).hexdigest()[:16]}.{extension}"
+        path = self.originals_dir / name
+        # Uploads run in threads; the quota check and write must not interleave
+        with self._originals_lock:
+            if path.exists():
+                return name
+            used = self.original_bytes()
+            if self.max_original_bytes is not None and used + len(body) > self.max_original_bytes:
+                raise OriginalsFull(name)
+            self.originals_dir.mkdir(parents=True, exist_ok=True)
+            temp = self.originals_dir / f".{name}.{os.getpid()}.tmp"
+            temp.write_bytes(body)
+            os.replace(temp, path)
+            self._original_bytes = used + len(body)
+        return name
+
+    def original_bytes(self) -> int:
+        """Total size of stored originals, scanned once and then kept up to date"""
+        if self._original_bytes is None:
+            self._original_bytes = sum(
+                path.stat().st_size for path in self.originals_dir.glob("*")
+                if path.is_file() and not path.name.startswith(".")
+            ) if self.originals_dir.is_dir() else 0
+        return self._original_bytes
+
+    async def variant(self, name: str, width: int, output_format: str) -> Tuple[Path, str]:
+        """Path and content hash of a variant, rendering it on a cache miss"""
+        original = self.original_path(name)
+        if original is None:
+            raise FileNotFoundError(name)
+        digest, _ = await asyncio.to_thread(self.describe, original)
+        variant_name = f"{digest}-{width}.{output_format}"
+        path = self.cache.get(variant_name)
+        if path is not None:
+            return path, digest
+
+        # Concurrent requests for the same variant share one render
+        pending = self._inflight.get(variant_name)
+        if pending is None:
+            pending = asyncio.ensure_future(self._render(original, variant_name, width, output_format))
+            self._inflight[variant_name] = pending
+            pending.add_done_callback(lambda _: self._inflight.pop(variant_name, None))
+        return await asyncio.shield(pending), digest
+
+    async def _render(self, original: Path, variant_name: str, width: int, output_format: str) -> Path:
+        async with self._semaphore:
+            body = await asyncio.to_thread(self._render_file, original, width, output_format)
+        logger.info("Rendered image variant %s (%d bytes)", variant_name, len(body))
+        path = await asyncio.to_thread(self.cache.write, variant_name, body)
+        # Bookkeeping stays on the event loop, next to cache.get
+        self.cache.record(variant_name, len(body))
+        return path
+
+    @staticmethod
+    def _render_file(original: Path, width: int, output_format: str) -> bytes:
+        # Reading the original is disk I/O too, so it happens in the thread along with the render
+        return render_variant(original.read_bytes(), width, output_format)
+
+    async def srcset_widths(self, name: str) -> Tuple[str, List[Tuple[int, int]]]:
+        """Content hash plus (requested, rendered) width pairs; originals are never upscaled"""
+        original = self.original_path(name)
+        if original is None:
+            raise FileNotFoundError(name)
+        digest, width = await asyncio.to_thread(self.describe, original)
+        pairs = [(candidate, candidate) for candidate in self.widths if candidate < width]
+        top = self.snap_width(width)
+        if not pairs or pairs[-1][0] != top:
+            pairs.append((top, min(top, width)))
+        return digest, pairs
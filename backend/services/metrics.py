@@ -0,0 +1,116 @@
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from pymongo import monitoring
+import threading
+import time
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served",
+    ["method"],
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "HTTP response body size by route template",
+    ["method", "route"],
+    buckets=(100, 1000, 5000, 10000, 50000, 100000, 500000, 1000000),
+)
+MONGO_COMMAND_LATENCY = Histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command latency by collection",
+    ["command", "collection"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+MONGO_COMMAND_FAILURES = Counter(
+    "mongodb_command_failures_total",
+    "MongoDB commands that returned an error",
+    ["command", "collection"],
+)
+
+
+class PrometheusMiddleware:
+    """ASGI middleware that records request metrics and serves them at metrics_path
+
+    Requests are labelled by route template (e.g. /api/projects/{project_id})
+    so ids don't blow up label cardinality.
+    """
+
+    def __init__(self, app, metrics_path: str = "/metrics"):
+        self.app = app
+        self.metrics_path = metrics_path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if scope["path"] == self.metrics_path:
+            await self._serve_metrics(send)
+            return
+
+        method = scope["method"]
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.labels(method).inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            REQUESTS_IN_PROGRESS.labels(method).dec()
+            # FastAPI stores the matched route on the scope during routing
+            route = scope.get("route")
+            template = getattr(route, "path_format", None) or "unmatched"
+            REQUEST_LATENCY.labels(method, template, str(status)).observe(elapsed)
+            RESPONSE_SIZE.labels(method, template).observe(size)
+
+    async def _serve_metrics(self, send):
+        body = generate_latest()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", CONTENT_TYPE_LATEST.encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Records per-collection MongoDB command durations"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._collections = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = "-"
+        with self._lock:
+            self._collections[(event.connection_id, event.request_id)] = collection
+
+    def _collection(self, event) -> str:
+        with self._lock:
+            return self._collections.pop((event.connection_id, event.request_id), "-")
+
+    def succeeded(self, event):
+        MONGO_COMMAND_LATENCY.labels(event.command_name, self._collection(event)).observe(
+            event.duration_micros / 1_000_000
+        )
+
+    def failed(self, event):
+        collection = self._collection(event)
+        MONGO_COMMAND_LATENCY.labels(event.command_name, collection).observe(event.duration_micros / 1_000_000)
+        MONGO_COMMAND_FAILURES.labels(event.command_name, collection).inc()
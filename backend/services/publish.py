@@ -0,0 +1,171 @@
+from typing import Dict, List, Optional
+from datetime import datetime
+from pathlib import Path
+from services.compression import compress_max, supported_encodings
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+
+logger = logging.getLogger(__name__)
+
+CURRENT_LINK = "current"
+MANIFEST = "manifest.json"
+ENCODING_SUFFIXES = {"gzip": ".gz", "br": ".br"}
+
+# Anything else (path separators, leading dots) never becomes a file name
+_SAFE_NAME = re.compile(r"^[A-Za-z0-9_][A-Za-z0-9_.-]*$")
+
+
+def safe_name(name: str) -> bool:
+    return bool(_SAFE_NAME.match(name))
+
+
+class PublishedSnapshot:
+    """One published version: its directory, validator, file list and content hashes"""
+
+    def __init__(self, path: Path, manifest: dict):
+        self.path = path
+        self.etag = manifest["etag"]
+        self.files = set(manifest["files"])
+        self.hashes = manifest.get("hashes", {})
+
+    def file(self, name: str, encoding: Optional[str] = None) -> Optional[Path]:
+        if encoding is not None:
+            name += ENCODING_SUFFIXES[encoding]
+        return self.path / name if name in self.files else None
+
+
+class SnapshotPublisher:
+    """Writes rendered portfolio JSON to versioned directories on disk
+
+    Each version is built in a temp directory and renamed into place, then the
+    "current" symlink is swapped to it with another rename, so readers (this
+    API or nginx serving directory/current/) never see a half-written file.
+    Bodies of at least min_compress_size also get .gz/.br siblings. Files whose
+    content hash matches the current version are hard-linked from it rather
+    than compressed and written again, so an edit to one project costs one
+    project's worth of I/O.
+    """
+
+    def __init__(self, directory: str, keep: int = 3, min_compress_size: int = 1024):
+        self.directory = Path(directory)
+        self.keep = max(keep, 1)
+        self.min_compress_size = min_compress_size
+        self._manifests = {}
+
+    def current(self) -> Optional[PublishedSnapshot]:
+        """The published version readers should get, or None before the first publish"""
+        try:
+            name = os.readlink(self.directory / CURRENT_LINK)
+        except OSError:
+            return None
+        if name not in self._manifests:
+            try:
+                manifest = json.loads((self.directory / name / MANIFEST).read_text())
+            except (OSError, ValueError):
+                return None
+            # Only the live version is worth remembering
+            self._manifests = {name: PublishedSnapshot(self.directory / name, manifest)}
+        return self._manifests[name]
+
+    def publish(self, name: str, etag: str, files: Dict[str, bytes]):
+        """Write files as version `name` and make it current (blocking; run in a thread)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        target = self.directory / name
+        if not target.exists():
+            previous = self.current()
+            temp = self.directory / f".{name}.{os.getpid()}.tmp"
+            shutil.rmtree(temp, ignore_errors=True)
+            written, hashes = [], {}
+            for file_name, body in files.items():
+                digest = hashlib.sha256(body).hexdigest()
+                hashes[file_name] = digest
+                encodings = supported_encodings() if len(body) >= self.min_compress_size else ()
+                variants = [file_name] + [file_name + ENCODING_SUFFIXES[encoding] for encoding in encodings]
+                if previous is not None and previous.hashes.get(file_name) == digest:
+                    linked = self._link(previous, variants, temp)
+                    if linked is not None:
+                        written += linked
+                        continue
+                written.append(self._write(temp / file_name, body))
+                for encoding in encodings:
+                    suffixed = file_name + ENCODING_SUFFIXES[encoding]
+                    written.append(self._write(temp / suffixed, compress_max(body, encoding)))
+            manifest = {
+                "etag": etag,
+                "files": [str(path.relative_to(temp)) for path in written],
+                "hashes": hashes,
+                "published_at": datetime.utcnow().isoformat(),
+            }
+            self._write(temp / MANIFEST, json.dumps(manifest).encode())
+            try:
+                os.rename(temp, target)
+            except OSError:
+                # Another worker published the same version first
+                shutil.rmtree(temp, ignore_errors=True)
+                if not target.exists():
+                    raise
+
+        link = self.directory / f".{CURRENT_LINK}.{os.getpid()}.tmp"
+        if link.is_symlink():
+            link.unlink()
+        os.symlink(name, link)
+        os.replace(link, self.directory / CURRENT_LINK)
+        self._prune(name)
+        logger.info("Published portfolio snapshot %s", name)
+
+    def withdraw(self):
+        """Stop serving the published version, e.g. after a failed publish left it stale"""
+        try:
+            (self.directory / CURRENT_LINK).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _link(self, previous: PublishedSnapshot, variants: List[str], temp: Path) -> Optional[List[Path]]:
+        """Hard-link a file and its compressed siblings from the previous version
+
+        Returns None (having removed any partial links) if the previous version
+        lacks one of them or was pruned meanwhile; the caller then writes fresh
+        copies, which must never happen through a link into the old version.
+        """
+        if not all(variant in previous.files for variant in variants):
+            return None
+        linked = []
+        try:
+            for variant in variants:
+                path = temp / variant
+                try:
+                    os.link(previous.path / variant, path)
+                except FileNotFoundError:
+                    # Usually just the first file in a new subdirectory
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    os.link(previous.path / variant, path)
+                linked.append(path)
+        except OSError:
+            for path in linked:
+                path.unlink()
+            return None
+        return linked
+
+    def _write(self, path: Path, body: bytes) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as handle:
+            handle.write(body)
+            handle.flush()
+            os.fsync(handle.fileno())
+        return path
+
+    def _prune(self, current: str):
+        versions = sorted(
+            (path for path in self.directory.iterdir()
+             if path.is_dir() and not path.is_symlink() and not path.name.startswith(".")),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True,
+        )
+        # Older versions linger for a while so in-flight responses can finish
+        for path in versions[self.keep:]:
+            if path.name != current:
+                shutil.rmtree(path, ignore_errors=True)
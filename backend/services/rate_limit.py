@@ -0,0 +1,99 @@
+from collections import OrderedDict
+from fastapi import HTTPException, Request
+import math
+import os
+import time
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, capacity: float, now: float):
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, rate: float, capacity: float, now: float):
+        self.tokens = min(capacity, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+
+    def wait_time(self, rate: float) -> float:
+        """Seconds until one token is available"""
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / rate
+
+
+class RateLimiter:
+    """Per-client and global token buckets
+
+    Client buckets live in an LRU table bounded by max_clients, so memory stays
+    flat no matter how many addresses we see.
+    """
+
+    def __init__(self, rate: float, burst: float, global_rate: float, global_burst: float,
+                 max_clients: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.global_rate = global_rate
+        self.global_burst = global_burst
+        self.max_clients = max_clients
+        self._clients = OrderedDict()
+        self._global = TokenBucket(global_burst, time.monotonic())
+        self.allowed = 0
+        self.rejected = 0
+
+    def check(self, key: str) -> float:
+        """Take a token for key; returns 0 when allowed, otherwise seconds to wait"""
+        now = time.monotonic()
+        bucket = self._clients.get(key)
+        if bucket is None:
+            bucket = self._clients[key] = TokenBucket(self.burst, now)
+            if len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+        else:
+            self._clients.move_to_end(key)
+            bucket.refill(self.rate, self.burst, now)
+        self._global.refill(self.global_rate, self.global_burst, now)
+
+        # Only spend tokens when both buckets allow the request
+        wait = max(bucket.wait_time(self.rate), self._global.wait_time(self.global_rate))
+        if wait:
+            self.rejected += 1
+            return wait
+        bucket.tokens -= 1
+        self._global.tokens -= 1
+        self.allowed += 1
+        return 0.0
+
+    def stats(self) -> dict:
+        return {"clients": len(self._clients), "allowed": self.allowed, "rejected": self.rejected}
+
+
+# Honour X-Forwarded-For only when running behind a trusted proxy
+TRUST_PROXY_HEADERS = os.environ.get("TRUST_PROXY_HEADERS", "false").lower() in ("1", "true", "yes")
+# How many proxies in front of the app each append an X-Forwarded-For entry
+TRUSTED_PROXY_HOPS = int(os.environ.get("TRUSTED_PROXY_HOPS", "1"))
+
+
+def client_ip(request: Request) -> str:
+    """The peer address, or the X-Forwarded-For entry our own proxies appended
+
+    Entries left of those were sent by the client and can be anything, so
+    they are never used; a chain shorter than the hop count is ignored.
+    """
+    if TRUST_PROXY_HEADERS and TRUSTED_PROXY_HOPS > 0:
+        forwarded = [entry.strip() for entry in request.headers.get("x-forwarded-for", "").split(",")]
+        if len(forwarded) >= TRUSTED_PROXY_HOPS and forwarded[-TRUSTED_PROXY_HOPS]:
+            return forwarded[-TRUSTED_PROXY_HOPS]
+    return request.client.host if request.client else "unknown"
+
+
+def rate_limit(limiter: RateLimiter):
+    """Dependency that rejects requests over the limit with 429 and Retry-After"""
+    async def dependency(request: Request):
+        wait = limiter.check(client_ip(request))
+        if wait:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, please slow down",
+                headers={"Retry-After": str(math.ceil(wait))}
+            )
+    return dependency
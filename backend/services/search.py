@@ -0,0 +1,123 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import bisect
+import math
+import re
+
+# Words plus trailing +/# so "C++" and "C#" stay searchable
+_TOKEN = re.compile(r"[a-z0-9]+[+#]*")
+
+# Matches in the name count more than matches deep in the details
+FIELD_WEIGHTS = {"name": 3.0, "technologies": 2.0, "description": 1.5, "details": 1.0}
+
+# Prefix expansions rank below exact term matches
+PREFIX_WEIGHT = 0.5
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+class ProjectSearchIndex:
+    """In-memory inverted index over projects, ranked with BM25
+
+    Term frequencies are weighted per field (BM25F-style). Every query term
+    also matches indexed terms it is a prefix of, found by bisecting the
+    sorted vocabulary, so "reac" finds "react".
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.version = None
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._terms: List[str] = []
+        self._lengths: Dict[str, float] = {}
+        self._doc_terms: Dict[str, List[str]] = {}
+        self._projects: Dict[str, dict] = {}
+        self._total_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def rebuild(self, projects: Iterable[dict], version: Optional[int] = None):
+        self._postings, self._terms, self._total_length = {}, [], 0.0
+        self._lengths, self._doc_terms, self._projects = {}, {}, {}
+        for project in projects:
+            self.put(project)
+        self.version = version
+
+    def put(self, project: dict):
+        """Index a project, replacing any previous copy with the same id"""
+        project_id = project["id"]
+        self.remove(project_id)
+        frequencies = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            value = project.get(field) or ""
+            text = " ".join(value) if isinstance(value, list) else value
+            for term in tokenize(text):
+                frequencies[term] = frequencies.get(term, 0.0) + weight
+        for term, frequency in frequencies.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._terms, term)
+            postings[project_id] = frequency
+        length = sum(frequencies.values())
+        self._lengths[project_id] = length
+        self._doc_terms[project_id] = list(frequencies)
+        self._projects[project_id] = project
+        self._total_length += length
+
+    def remove(self, project_id: str):
+        length = self._lengths.pop(project_id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        del self._projects[project_id]
+        for term in self._doc_terms.pop(project_id):
+            postings = self._postings[term]
+            del postings[project_id]
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect.bisect_left(self._terms, term)]
+
+    def get(self, project_id: str) -> Optional[dict]:
+        return self._projects.get(project_id)
+
+    def _expand(self, token: str) -> List[Tuple[str, float]]:
+        """Indexed terms a query token matches, with their weight"""
+        matches = []
+        index = bisect.bisect_left(self._terms, token)
+        while index < len(self._terms) and self._terms[index].startswith(token):
+            term = self._terms[index]
+            matches.append((term, 1.0 if term == token else PREFIX_WEIGHT))
+            index += 1
+        return matches
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[str, float]]:
+        """(project id, score) pairs for projects matching every query token, best first"""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self._lengths:
+            return []
+        count = len(self._lengths)
+        average_length = self._total_length / count
+        scores = None
+        for token in tokens:
+            token_scores = {}
+            for term, weight in self._expand(token):
+                postings = self._postings[term]
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for project_id, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[project_id] / average_length)
+                    score = weight * idf * frequency * (self.k1 + 1) / (frequency + norm)
+                    # A token counts once per project, through its best-matching term
+                    if score > token_scores.get(project_id, 0.0):
+                        token_scores[project_id] = score
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {pid: scores[pid] + s for pid, s in token_scores.items() if pid in scores}
+            if not scores:
+                return []
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(project_id, round(score, 4)) for project_id, score in ranked[:limit]]
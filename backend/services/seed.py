@@ -0,0 +1,200 @@
+from typing import Callable, Iterator, List, Optional
+from datetime import datetime, timedelta
+from itertools import islice
+from models.portfolio import Contact, ContactMessage, Education, PersonalInfo, Project, TechStack
+import json
+import random
+import uuid
+
+# Spelling variants are deliberate: technology facets should merge them
+TECHNOLOGIES = [
+    "React.js", "React", "Node.js", "Express.js", "MongoDB", "PostgreSQL", "MySQL", "Redis",
+    "TailwindCSS", "Tailwind CSS", "Next.js", "Vite", "TypeScript", "JavaScript", "Python",
+    "FastAPI", "Django", "Flask", "Go", "Rust", "C++", "Docker", "Kubernetes", "GraphQL",
+    "Socket.IO", "JWT", "AWS", "Terraform", "Zustand", "Redux",
+]
+
+WORDS = [
+    "realtime", "dashboard", "chat", "weather", "analytics", "portfolio", "commerce", "search",
+    "streaming", "scheduler", "tracker", "editor", "gallery", "inventory", "payments", "auth",
+    "notifications", "maps", "recommendation", "forum", "blog", "crm", "booking", "fitness",
+    "music", "video", "finance", "budget", "social", "learning", "quiz", "kanban",
+]
+
+DEGREES = ["B.Tech", "M.Tech", "B.Sc", "M.Sc", "MBA", "Diploma", "Ph.D"]
+SUBJECTS = ["Computer Science", "Information Technology", "Mathematics", "Electronics", "Data Science"]
+INSTITUTIONS = ["Institute of Technology", "State University", "College of Engineering", "Polytechnic"]
+
+# Fields a new portfolio can't be created without
+REQUIRED_FIELDS = {"personal": PersonalInfo, "tech_stack": TechStack, "contact": Contact}
+
+# Synthetic timestamps start here so repeated runs produce identical documents
+EPOCH = datetime(2020, 1, 1)
+
+
+def batched(items, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(WORDS, k=words)).capitalize()
+
+
+def synthetic_base(seed: int) -> dict:
+    """Portfolio fields other than projects and education"""
+    rng = random.Random(f"{seed}:base")
+    return {
+        "personal": {
+            "name": f"Synthetic Developer {seed}",
+            "title": "Full Stack Developer",
+            "location": "Nowhere",
+            "bio": _sentence(rng, 40),
+        },
+        "tech_stack": {
+            "languages": ["JavaScript", "Python", "C++"],
+            "frameworks": ["React.js", "Tailwind CSS", "FastAPI"],
+            "tools": ["Docker", "Git"],
+            "databases": ["MongoDB", "PostgreSQL"],
+        },
+        "contact": {"email": f"seed{seed}@example.com"},
+    }
+
+
+def synthetic_projects(count: int, seed: int) -> Iterator[dict]:
+    """Projects with stable ids and timestamps, so re-seeding updates rather than duplicates"""
+    rng = random.Random(f"{seed}:projects")
+    for index in range(count):
+        yield {
+            "id": f"seed-{seed}-project-{index:07d}",
+            "name": f"{_sentence(rng, 2)} {index}",
+            "description": _sentence(rng, 12),
+            "details": _sentence(rng, 60),
+            "technologies": rng.sample(TECHNOLOGIES, rng.randint(2, 6)),
+            "live_link": None,
+            "github_link": f"https://github.com/example/project-{index}",
+            "image": None,
+            "featured": rng.random() < 0.1,
+            "created_at": EPOCH + timedelta(minutes=index),
+        }
+
+
+def synthetic_education(count: int, seed: int) -> List[dict]:
+    rng = random.Random(f"{seed}:education")
+    return [
+        {
+            "id": f"seed-{seed}-education-{index:05d}",
+            "degree": f"{rng.choice(DEGREES)} in {rng.choice(SUBJECTS)}",
+            "institution": f"{rng.choice(WORDS).capitalize()} {rng.choice(INSTITUTIONS)}",
+            "graduation_year": str(2000 + rng.randint(0, 30)),
+            "status": rng.choice(["Completed", "Pursuing"]),
+            "created_at": EPOCH + timedelta(days=index),
+        }
+        for index in range(count)
+    ]
+
+
+def synthetic_messages(count: int, seed: int) -> Iterator[dict]:
+    rng = random.Random(f"{seed}:messages")
+    for index in range(count):
+        yield {
+            "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "name": f"Visitor {index}",
+            "email": f"visitor{index}@example.com",
+            "message": _sentence(rng, rng.randint(5, 40)),
+            "created_at": EPOCH + timedelta(seconds=index * 37),
+            "replied": rng.random() < 0.3,
+        }
+
+
+def load_fixture(path: str) -> dict:
+    with open(path) as handle:
+        return json.load(handle)
+
+
+class Seeder:
+    """Bulk-loads a portfolio, its projects and contact messages into a storage backend
+
+    Projects go through projects.bulk_upsert and messages through
+    messages.insert_many, batch_size at a time, so memory stays flat however
+    many records are generated. Stable ids make a repeated run an update.
+    wrote tells a caller whether storage was touched, even if a load failed halfway.
+    """
+
+    def __init__(self, storage, batch_size: int = 1000,
+                 progress: Optional[Callable[[str, int], None]] = None):
+        self.storage = storage
+        self.batch_size = batch_size
+        self.progress = progress or (lambda kind, done: None)
+        self.wrote = False
+
+    async def portfolio(self, fields: dict, replace: bool = True):
+        """Create the active portfolio, or update it; replace also drops its projects"""
+        fields = {key: value for key, value in fields.items() if key != "projects"}
+        now = datetime.utcnow()
+        if await self.storage.portfolios.exists():
+            if replace:
+                fields["projects"] = []
+            self.wrote = True
+            await self.storage.portfolios.update({**fields, "updated_at": now})
+        else:
+            missing = [key for key in REQUIRED_FIELDS if key not in fields]
+            if missing:
+                raise ValueError(f"A new portfolio needs {', '.join(missing)}")
+            self.wrote = True
+            await self.storage.portfolios.create({
+                "id": str(uuid.uuid4()), "active": True, "projects": [], "education": [],
+                "version": 0, "created_at": now, "updated_at": now, **fields,
+            })
+
+    async def projects(self, projects) -> int:
+        done = 0
+        for batch in batched(projects, self.batch_size):
+            self.wrote = True
+            await self.storage.projects.bulk_upsert(batch)
+            done += len(batch)
+            self.progress("projects", done)
+        return done
+
+    async def messages(self, messages) -> int:
+        """Insert messages in batches; returns how many were new"""
+        done = inserted = 0
+        for batch in batched(messages, self.batch_size):
+            self.wrote = True
+            inserted += await self.storage.messages.insert_many(batch)
+            done += len(batch)
+            self.progress("messages", done)
+        return inserted
+
+    async def synthetic(self, projects: int, education: int, messages: int, seed: int,
+                        replace: bool = True) -> dict:
+        base = synthetic_base(seed)
+        if await self.storage.portfolios.exists() and not replace:
+            base = {}
+        await self.portfolio({**base, "education": synthetic_education(education, seed)}, replace)
+        return {
+            "projects": await self.projects(synthetic_projects(projects, seed)),
+            "education": education,
+            "messages": await self.messages(synthetic_messages(messages, seed)),
+        }
+
+    async def fixture(self, fixture: dict, replace: bool = True) -> dict:
+        """Load a fixture shaped like the Portfolio model, plus optional contact_messages
+
+        Every item is validated before the first write, so a bad one leaves storage untouched.
+        """
+        fields = {key: model(**fixture[key]).dict() for key, model in REQUIRED_FIELDS.items() if key in fixture}
+        if "education" in fixture or replace:
+            fields["education"] = [Education(**item).dict() for item in fixture.get("education", [])]
+        projects = [Project(**item).dict() for item in fixture.get("projects", [])]
+        messages = [ContactMessage(**item).dict() for item in fixture.get("contact_messages", [])]
+        await self.portfolio(fields, replace)
+        return {
+            "projects": await self.projects(projects),
+            "education": len(fields.get("education", [])),
+            "messages": await self.messages(messages),
+        }
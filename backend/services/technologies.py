@@ -0,0 +1,101 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+import json
+import re
+
+# Case, spacing and separators don't make a different technology
+_SEPARATORS = re.compile(r"[\s._-]+")
+
+# Nor does a JavaScript library's ".js" suffix ("React.js", "ReactJS", "React")
+_JS_SUFFIX = re.compile(r"(?<=.)[\s._-]*js$")
+
+
+def technology_key(name: str) -> str:
+    """Normalize a name so "Tailwind CSS", "TailwindCSS" and "tailwind-css" share a key"""
+    return _SEPARATORS.sub("", _JS_SUFFIX.sub("", name.strip().lower()))
+
+
+class TechnologyFacets:
+    """Technology -> projects aggregate, kept up to date one project at a time
+
+    Each technology is listed under its most common spelling, with the ids of
+    the projects using it and the tech stack categories it appears in. The
+    sorted list and its JSON are built once per change, not per request.
+    """
+
+    def __init__(self):
+        self.version = None
+        self._spellings: Dict[str, Counter] = {}
+        self._projects: Dict[str, Dict[str, None]] = {}
+        self._project_keys: Dict[str, List[tuple]] = {}
+        self._categories: Dict[str, List[str]] = {}
+        self._json = None
+
+    def rebuild(self, projects: Iterable[dict], version: Optional[int] = None,
+                tech_stack: Optional[dict] = None):
+        self._spellings, self._projects, self._project_keys, self._categories = {}, {}, {}, {}
+        for category, names in (tech_stack or {}).items():
+            for name in names:
+                key = technology_key(name)
+                if not key:
+                    continue
+                self._spellings.setdefault(key, Counter())[name.strip()] += 1
+                self._projects.setdefault(key, {})
+                categories = self._categories.setdefault(key, [])
+                if category not in categories:
+                    categories.append(category)
+        for project in projects:
+            self.put(project)
+        self.version = version
+
+    def put(self, project: dict):
+        """Count a project's technologies, replacing its previous ones"""
+        project_id = project["id"]
+        self.remove(project_id)
+        entries = []
+        for name in project.get("technologies", []):
+            key = technology_key(name)
+            if not key or key in self._projects and project_id in self._projects[key]:
+                continue
+            entries.append((key, name.strip()))
+            self._spellings.setdefault(key, Counter())[name.strip()] += 1
+            self._projects.setdefault(key, {})[project_id] = None
+        self._project_keys[project_id] = entries
+        self._json = None
+
+    def remove(self, project_id: str):
+        entries = self._project_keys.pop(project_id, None)
+        if entries is None:
+            return
+        for key, spelling in entries:
+            self._projects[key].pop(project_id, None)
+            spellings = self._spellings[key]
+            spellings[spelling] -= 1
+            if not spellings[spelling]:
+                del spellings[spelling]
+            # Tech stack entries stay listed with a zero count
+            if not self._projects[key] and key not in self._categories:
+                del self._projects[key]
+                del self._spellings[key]
+        self._json = None
+
+    def facets(self) -> List[dict]:
+        facets = []
+        for key, project_ids in self._projects.items():
+            spellings = self._spellings[key]
+            # Most used spelling wins; ties go to the alphabetically first
+            name = min(spellings, key=lambda spelling: (-spellings[spelling], spelling))
+            facets.append({
+                "name": name,
+                "key": key,
+                "count": len(project_ids),
+                "project_ids": list(project_ids),
+                "categories": self._categories.get(key, []),
+            })
+        facets.sort(key=lambda facet: (-facet["count"], facet["name"].lower()))
+        return facets
+
+    def json(self) -> bytes:
+        if self._json is None:
+            self._json = json.dumps(self.facets(), separators=(",", ":")).encode()
+        return self._json
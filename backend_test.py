@@ -12,7 +12,10 @@ import sys
 import os
 
 # Get backend URL from environment
-BACKEND_URL = "https://906d9b3f-8f52-47e2-b6f1-9722c53d6f5f.preview.emergentagent.com/api"
+# (for load/latency numbers use backend/benchmarks/load.py instead)
+BACKEND_URL = os.environ.get(
+    "BACKEND_URL", "https://906d9b3f-8f52-47e2-b6f1-9722c53d6f5f.preview.emergentagent.com/api"
+)
 
 class PortfolioAPITester:
     def __init__(self):
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import "./App.css";
 import { BrowserRouter } from "react-router-dom";
 import { Toaster } from "./components/ui/toaster";
@@ -21,6 +21,11 @@ function App() {
   const [portfolioData, setPortfolioData] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const versionRef = useRef(null);
+
+  useEffect(() => {
+    versionRef.current = portfolioData ? portfolioData.version : null;
+  }, [portfolioData]);
 
   useEffect(() => {
     const fetchPortfolioData = async () => {
@@ -38,6 +43,22 @@ function App() {
     fetchPortfolioData();
   }, []);
 
+  // Refetch when the backend announces a new portfolio version
+  useEffect(() => {
+    if (!window.EventSource) return;
+    const events = new EventSource(`${API}/portfolio/events`);
+    events.addEventListener("portfolio", (event) => {
+      const notice = JSON.parse(event.data);
+      if (versionRef.current === notice.version) return;
+      // Revalidate rather than take the browser's cached copy
+      fetch(`${API}/portfolio`, { cache: "no-cache" })
+        .then((response) => response.json())
+        .then(setPortfolioData)
+        .catch((err) => console.error("Error refreshing portfolio data:", err));
+    });
+    return () => events.close();
+  }, []);
+
   if (loading) {
     return (
       <div className="min-h-screen bg-gradient-to-br from-slate-900 via-blue-900 to-purple-900 flex items-center justify-center">
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Mail, Github, Linkedin, Send, MapPin, MessageCircle } from 'lucide-react';
 import { Card, CardContent } from './ui/card';
 import { Button } from './ui/button';
@@ -18,6 +18,8 @@ const Contact = ({ data }) => {
     message: ''
   });
   const [isSubmitting, setIsSubmitting] = useState(false);
+  // One key per message, so retrying after a dropped response can't send it twice
+  const idempotencyKey = useRef(null);
   const { toast } = useToast();
 
   useEffect(() => {
@@ -40,8 +42,15 @@ const Contact = ({ data }) => {
     e.preventDefault();
     setIsSubmitting(true);
 
+    if (!idempotencyKey.current) {
+      idempotencyKey.current = window.crypto?.randomUUID?.() || `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+    }
+
     try {
-      await axios.post(`${API}/contact`, formData);
+      await axios.post(`${API}/contact`, formData, {
+        headers: { 'Idempotency-Key': idempotencyKey.current }
+      });
+      idempotencyKey.current = null;
       toast({
         title: "Message Sent!",
         description: "Thank you for your message. I'll get back to you soon!",
@@ -60,6 +69,7 @@ const Contact = ({ data }) => {
   };
 
   const handleChange = (e) => {
+    idempotencyKey.current = null;
     setFormData({
       ...formData,
       [e.target.name]: e.target.value
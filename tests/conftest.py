@@ -0,0 +1,41 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+# The memory backend needs no database; the contact form limit is raised so
+# tests can post freely (rate limiting has its own tests)
+os.environ["STORAGE_BACKEND"] = "memory"
+os.environ.pop("PORTFOLIO_PUBLISH_DIR", None)
+os.environ.setdefault("CONTACT_BURST", "1000")
+os.environ.setdefault("CONTACT_GLOBAL_BURST", "1000")
+
+
+@pytest.fixture
+def empty_client():
+    """API client on a fresh, empty in-memory storage"""
+    from fastapi.testclient import TestClient
+    from repositories.memory import MemoryStorage
+    from routes import health, init_data, portfolio
+    import server
+
+    storage = MemoryStorage()
+    server.storage = storage
+    for module in (portfolio, init_data, health):
+        module.init_storage(storage)
+    portfolio.portfolio_cache.invalidate()
+    portfolio._rebuild_indexes(None)
+
+    with TestClient(server.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def client(empty_client):
+    """API client with the sample portfolio loaded"""
+    assert empty_client.post("/api/init-portfolio").status_code == 200
+    return empty_client
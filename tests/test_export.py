@@ -0,0 +1,35 @@
+import asyncio
+import csv
+import io
+from datetime import datetime
+
+from services.export import csv_lines
+
+
+async def _cursor(documents):
+    for document in documents:
+        yield document
+
+
+def export_csv(documents):
+    async def collect():
+        return b"".join([chunk async for chunk in csv_lines(_cursor(documents))])
+    return list(csv.reader(io.StringIO(asyncio.run(collect()).decode())))
+
+
+def test_formula_cells_are_neutralized():
+    rows = export_csv([{
+        "id": "m1", "name": "=HYPERLINK(\"http://evil\")", "email": "a@b.co",
+        "message": "@SUM(A1)", "created_at": datetime(2024, 1, 2, 3, 4, 5), "replied": False,
+    }])
+    assert rows[0] == ["id", "name", "email", "message", "created_at", "replied"]
+    assert rows[1] == ["m1", "'=HYPERLINK(\"http://evil\")", "a@b.co", "'@SUM(A1)", "2024-01-02T03:04:05", "False"]
+
+
+def test_other_prefixes_and_plain_text():
+    rows = export_csv([
+        {"id": "m2", "name": "+1 555", "message": "-2"},
+        {"id": "m3", "name": "Ann", "message": "Hi = there"},
+    ])
+    assert rows[1][1] == "'+1 555" and rows[1][3] == "'-2"
+    assert rows[2][1] == "Ann" and rows[2][3] == "Hi = there"
@@ -0,0 +1,179 @@
+import asyncio
+
+import pytest
+
+from services.idempotency import IdempotencyKeyInProgress, IdempotencyKeyReused, IdempotencyStore
+
+PROJECT = {"name": "Retry", "description": "d", "details": "x", "technologies": ["Go"]}
+MESSAGE = {"name": "Visitor", "email": "visitor@example.com", "message": "Hello there"}
+
+
+class FakeRepository:
+    """Shared claim store with the interface of MongoIdempotencyRepository"""
+
+    def __init__(self):
+        self.records = {}
+
+    async def claim(self, key, fingerprint, expires_at):
+        if key in self.records:
+            return self.records[key]
+        self.records[key] = {"fingerprint": fingerprint, "response": None}
+        return None
+
+    async def complete(self, key, response, expires_at):
+        self.records[key]["response"] = response
+
+    async def release(self, key):
+        if self.records.get(key, {}).get("response") is None:
+            self.records.pop(key, None)
+
+
+def counting_write(calls):
+    async def write():
+        calls.append(1)
+        return {"count": len(calls)}
+    return write
+
+
+def test_replays_first_response():
+    store = IdempotencyStore(ttl=60)
+    calls = []
+
+    async def scenario():
+        first = await store.run("k", "f", counting_write(calls))
+        second = await store.run("k", "f", counting_write(calls))
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == ({"count": 1}, False)
+    assert second == ({"count": 1}, True)
+    assert len(calls) == 1
+
+
+def test_key_reused_with_different_request():
+    store = IdempotencyStore(ttl=60)
+
+    async def scenario():
+        await store.run("k", "f", counting_write([]))
+        await store.run("k", "other", counting_write([]))
+
+    with pytest.raises(IdempotencyKeyReused):
+        asyncio.run(scenario())
+
+
+def test_failed_write_releases_key():
+    repository = FakeRepository()
+    store = IdempotencyStore(ttl=60, repository=repository)
+    calls = []
+
+    async def failing():
+        raise RuntimeError("write failed")
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await store.run("k", "f", failing)
+        assert "k" not in repository.records
+        return await store.run("k", "f", counting_write(calls))
+
+    assert asyncio.run(scenario()) == ({"count": 1}, False)
+    assert repository.records["k"]["response"] == {"count": 1}
+
+
+def test_concurrent_duplicates_share_one_write():
+    store = IdempotencyStore(ttl=60)
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"id": "one"}
+
+    async def scenario():
+        return await asyncio.gather(*(store.run("k", "f", slow) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert [replayed for _, replayed in results].count(False) == 1
+    assert all(response == {"id": "one"} for response, _ in results)
+
+
+def test_claim_held_by_another_worker():
+    repository = FakeRepository()
+    repository.records["k"] = {"fingerprint": "f", "response": None}
+    store = IdempotencyStore(ttl=60, repository=repository)
+
+    with pytest.raises(IdempotencyKeyInProgress):
+        asyncio.run(store.run("k", "f", counting_write([])))
+
+
+def test_expired_key_runs_again(monkeypatch):
+    store = IdempotencyStore(ttl=60)
+    calls = []
+    now = [1000.0]
+    monkeypatch.setattr("services.idempotency.time.monotonic", lambda: now[0])
+
+    asyncio.run(store.run("k", "f", counting_write(calls)))
+    now[0] += 61
+    assert asyncio.run(store.run("k", "f", counting_write(calls))) == ({"count": 2}, False)
+
+
+def test_lru_bound():
+    store = IdempotencyStore(ttl=60, max_entries=2)
+    for key in ("a", "b", "c"):
+        asyncio.run(store.run(key, "f", counting_write([])))
+    assert store.stats()["keys"] == 2
+    calls = []
+    assert asyncio.run(store.run("a", "f", counting_write(calls)))[1] is False
+
+
+def test_contact_replay(client):
+    headers = {"Idempotency-Key": "contact-1"}
+    first = client.post("/api/contact", json=MESSAGE, headers=headers)
+    second = client.post("/api/contact", json=MESSAGE, headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert "idempotent-replayed" not in first.headers
+    assert second.headers["idempotent-replayed"] == "true"
+    assert len(client.get("/api/contact-messages").json()) == 1
+
+
+def test_project_replay(client):
+    before = len(client.get("/api/projects").json())
+    headers = {"Idempotency-Key": "project-1"}
+    first = client.post("/api/projects", json=PROJECT, headers=headers)
+    second = client.post("/api/projects", json=PROJECT, headers=headers)
+
+    assert first.json()["id"] == second.json()["id"]
+    assert len(client.get("/api/projects").json()) == before + 1
+
+
+def test_without_key_every_post_writes(client):
+    first = client.post("/api/contact", json=MESSAGE)
+    second = client.post("/api/contact", json=MESSAGE)
+    assert first.json()["id"] != second.json()["id"]
+
+
+def test_key_reuse_is_rejected(client):
+    headers = {"Idempotency-Key": "contact-2"}
+    client.post("/api/contact", json=MESSAGE, headers=headers)
+    response = client.post("/api/contact", json={**MESSAGE, "message": "Something else"}, headers=headers)
+    assert response.status_code == 422
+
+
+def test_keys_are_scoped_per_endpoint(client):
+    headers = {"Idempotency-Key": "shared"}
+    client.post("/api/contact", json=MESSAGE, headers=headers)
+    response = client.post("/api/projects", json=PROJECT, headers=headers)
+    assert response.status_code == 200
+    assert "idempotent-replayed" not in response.headers
+
+
+def test_failed_request_can_be_retried(empty_client):
+    headers = {"Idempotency-Key": "project-2"}
+    assert empty_client.post("/api/projects", json=PROJECT, headers=headers).status_code == 404
+
+    empty_client.post("/api/init-portfolio")
+    response = empty_client.post("/api/projects", json=PROJECT, headers=headers)
+    assert response.status_code == 200
+    assert "idempotent-replayed" not in response.headers
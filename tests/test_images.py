@@ -0,0 +1,77 @@
+import asyncio
+import io
+import threading
+
+import pytest
+from PIL import Image
+
+from services.images import DiskLRUCache, ImagePipeline, UnreadableImage
+
+
+def png(width=40, height=20):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "teal").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    return ImagePipeline(str(tmp_path / "originals"), DiskLRUCache(str(tmp_path / "variants"), 10 ** 7), [16, 32])
+
+
+def test_undecodable_upload_is_unreadable(pipeline):
+    with pytest.raises(UnreadableImage):
+        pipeline.store_original(b"not an image", "png")
+
+
+def test_disk_errors_are_not_unreadable(pipeline):
+    pipeline.originals_dir.parent.mkdir(parents=True, exist_ok=True)
+    pipeline.originals_dir.write_text("a file where the directory should be")
+    with pytest.raises(OSError):
+        pipeline.store_original(png(), "png")
+
+
+def test_render_reads_original_off_the_loop(pipeline, monkeypatch):
+    name = pipeline.store_original(png(), "png")
+    readers = []
+    read_bytes = type(pipeline.originals_dir).read_bytes
+
+    def tracking_read(path):
+        readers.append(threading.current_thread())
+        return read_bytes(path)
+
+    async def scenario():
+        monkeypatch.setattr(type(pipeline.originals_dir), "read_bytes", tracking_read)
+        return await pipeline.variant(name, 16, "jpeg")
+
+    path, _ = asyncio.run(scenario())
+    assert readers and threading.main_thread() not in readers
+    with Image.open(path) as image:
+        assert image.width == 16
+
+
+@pytest.fixture
+def uploads(client, pipeline, monkeypatch):
+    monkeypatch.setattr("routes.images.ALLOW_IMAGE_UPLOADS", True)
+    monkeypatch.setattr("routes.images.image_pipeline", pipeline)
+    return client
+
+
+def test_upload_rejects_undecodable_body(uploads):
+    response = uploads.post("/api/images", content=b"not an image", headers={"Content-Type": "image/png"})
+    assert response.status_code == 400
+
+
+def test_upload_returns_srcset(uploads):
+    response = uploads.post("/api/images", content=png(), headers={"Content-Type": "image/png"})
+    assert response.status_code == 200
+    # Rendered at the largest configured width below the original's 40px
+    assert response.json()["width"] == 32
+
+
+def test_upload_disk_error_is_not_a_bad_request(uploads, pipeline):
+    pipeline.originals_dir.parent.mkdir(parents=True, exist_ok=True)
+    pipeline.originals_dir.write_text("a file where the directory should be")
+    # TestClient re-raises server errors instead of answering 500
+    with pytest.raises(OSError):
+        uploads.post("/api/images", content=png(), headers={"Content-Type": "image/png"})
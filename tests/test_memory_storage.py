@@ -0,0 +1,61 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from repositories.memory import MemoryStorage
+
+PORTFOLIO = {"id": "p", "active": True, "projects": [], "version": 0}
+
+
+def test_failed_snapshot_stays_dirty(tmp_path, monkeypatch):
+    storage = MemoryStorage(snapshot_path=str(tmp_path / "state.json"))
+
+    def failing(raw):
+        raise OSError("disk full")
+
+    async def scenario():
+        await storage.portfolios.create(PORTFOLIO)
+        monkeypatch.setattr(storage, "_write_atomic", failing)
+        with pytest.raises(OSError):
+            await storage.save_snapshot()
+        assert storage.state.dirty
+        monkeypatch.undo()
+        await storage.save_snapshot()
+        assert not storage.state.dirty
+
+    asyncio.run(scenario())
+    assert "\"id\": \"p\"" in (tmp_path / "state.json").read_text()
+
+
+def test_close_waits_for_running_write(tmp_path):
+    storage = MemoryStorage(snapshot_path=str(tmp_path / "state.json"), snapshot_interval=0.01)
+    write_atomic = storage._write_atomic
+    running = []
+    overlaps = []
+
+    def slow_write(raw):
+        if running:
+            overlaps.append(raw)
+        running.append(threading.current_thread())
+        time.sleep(0.1)
+        write_atomic(raw)
+        running.pop()
+
+    storage._write_atomic = slow_write
+
+    async def scenario():
+        await storage.start()
+        await storage.portfolios.create(PORTFOLIO)
+        # Let the loop start its write, then change state and close mid-write
+        await asyncio.sleep(0.05)
+        await storage.portfolios.update({"name": "final"})
+        await storage.close()
+
+    asyncio.run(scenario())
+    assert overlaps == []
+
+    reloaded = MemoryStorage(snapshot_path=str(tmp_path / "state.json"))
+    reloaded.state.load((tmp_path / "state.json").read_text())
+    assert reloaded.state.portfolio["name"] == "final"
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from repositories.message_buffer import BufferedMessageWriter, QueueFull
+
+MESSAGE = {"name": "Visitor", "email": "visitor@example.com", "message": "Hello there"}
+
+
+class FakeRepository:
+    def __init__(self):
+        self.batches = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def insert_many(self, messages):
+        await self.release.wait()
+        self.batches.append([message["id"] for message in messages])
+        return len(messages)
+
+
+def test_close_drains_queued_messages():
+    async def scenario():
+        repository = FakeRepository()
+        writer = BufferedMessageWriter(repository, batch_size=2, flush_interval=60)
+        writer.start()
+        for index in range(5):
+            writer.submit({"id": str(index)})
+        await writer.close()
+        return repository, writer
+
+    repository, writer = asyncio.run(scenario())
+    assert repository.batches == [["0", "1"], ["2", "3"], ["4"]]
+    assert writer.stats() == {"running": False, "pending": 0, "flushed": 5, "batches": 3, "dropped": 0}
+
+
+def test_submit_after_close_is_rejected():
+    async def scenario():
+        writer = BufferedMessageWriter(FakeRepository())
+        writer.start()
+        await writer.close()
+        writer.submit({"id": "late"})
+
+    with pytest.raises(QueueFull):
+        asyncio.run(scenario())
+
+
+def test_limit_counts_the_batch_being_written():
+    async def scenario():
+        repository = FakeRepository()
+        repository.release.clear()
+        writer = BufferedMessageWriter(repository, batch_size=2, flush_interval=0, max_queue=3)
+        writer.start()
+        for index in range(3):
+            writer.submit({"id": str(index)})
+        # Let the flusher take a batch off the queue and block in insert_many
+        await asyncio.sleep(0.01)
+        with pytest.raises(QueueFull):
+            writer.submit({"id": "over"})
+        assert writer.stats()["pending"] == 3
+
+        repository.release.set()
+        await writer.close()
+        writer.start()
+        writer.submit({"id": "after"})
+        await writer.close()
+        return repository
+
+    repository = asyncio.run(scenario())
+    assert sum(repository.batches, []) == ["0", "1", "2", "after"]
+
+
+def test_full_buffer_returns_503(client, monkeypatch):
+    from routes import portfolio
+
+    class FullWriter:
+        def submit(self, document):
+            raise QueueFull("Message buffer is full")
+
+    monkeypatch.setattr(portfolio, "message_writer", FullWriter())
+    response = client.post("/api/contact", json=MESSAGE)
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
@@ -0,0 +1,103 @@
+import asyncio
+import base64
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from repositories.pagination import InvalidCursor, decode_cursor, encode_cursor, paginate
+
+EPOCH = datetime(2024, 1, 1)
+
+
+def test_cursor_round_trip():
+    item = {"id": "abc", "created_at": datetime(2024, 5, 17, 9, 30, 0, 123456)}
+    assert decode_cursor(encode_cursor(item)) == (item["created_at"], "abc")
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "W10", "WyJ4IiwgInkiXQ"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+def test_offset_cursor_is_normalized_to_naive_utc():
+    raw = json.dumps(["2024-01-01T02:00:00+02:00", "x"]).encode()
+    cursor = base64.urlsafe_b64encode(raw).decode().rstrip("=")
+    assert decode_cursor(cursor) == (datetime(2024, 1, 1), "x")
+
+
+def test_paginate_trims_extra_item():
+    items = [{"id": str(i), "created_at": EPOCH} for i in range(4)]
+    page, cursor = paginate(items, 3)
+    assert [item["id"] for item in page] == ["0", "1", "2"]
+    assert decode_cursor(cursor) == (EPOCH, "2")
+    assert paginate(items[:3], 3) == (items[:3], None)
+
+
+def walk(client, path, params):
+    """Follow X-Next-Cursor until the last page, returning every id seen"""
+    ids, cursor_name = [], "cursor" if path == "/api/projects" else "after"
+    while True:
+        response = client.get(path, params=params)
+        assert response.status_code == 200
+        ids += [item["id"] for item in response.json()]
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            return ids
+        params = {**params, cursor_name: cursor}
+
+
+def test_project_pages_cover_every_project(client):
+    for index in range(7):
+        client.post("/api/projects", json={
+            "name": f"Project {index}", "description": "d", "details": "x", "technologies": ["Go"]
+        })
+    all_ids = [project["id"] for project in client.get("/api/projects").json()]
+    assert walk(client, "/api/projects", {"limit": 3}) == all_ids
+
+
+def test_project_offset_cursor(client):
+    cursor = base64.urlsafe_b64encode(b'["2024-01-01T00:00:00+00:00", "x"]').decode()
+    assert client.get("/api/projects", params={"limit": 3, "cursor": cursor}).status_code == 200
+
+
+def test_next_cursor_readable_cross_origin(client):
+    response = client.get("/api/projects", params={"limit": 1}, headers={"Origin": "http://localhost:3000"})
+    assert "x-next-cursor" in response.headers["access-control-expose-headers"].lower()
+
+
+def test_project_invalid_cursor(client):
+    response = client.get("/api/projects", params={"limit": 3, "cursor": "bogus"})
+    assert response.status_code == 400
+
+
+def add_messages(count):
+    import server
+
+    async def insert():
+        for index in range(count):
+            await server.storage.messages.insert({
+                "id": f"m{index:02d}", "name": "n", "email": "a@b.co", "message": "x",
+                # Pairs share a timestamp, so the id tie-break is exercised
+                "created_at": EPOCH + timedelta(minutes=index // 2), "replied": index % 3 == 0,
+            })
+
+    asyncio.run(insert())
+
+
+def test_message_pages_newest_first(client):
+    add_messages(9)
+    ids = walk(client, "/api/contact-messages", {"limit": 2})
+    assert ids == [f"m{index:02d}" for index in reversed(range(9))]
+
+
+def test_message_pages_with_filter(client):
+    add_messages(9)
+    ids = walk(client, "/api/contact-messages", {"limit": 2, "replied": "true"})
+    assert ids == ["m06", "m03", "m00"]
+
+
+def test_message_invalid_cursor(client):
+    response = client.get("/api/contact-messages", params={"after": "bogus"})
+    assert response.status_code == 400
@@ -0,0 +1,71 @@
+import pytest
+
+from repositories.projects import version_filter
+
+PROJECT = {"name": "Edited", "description": "d", "details": "x", "technologies": ["Go"]}
+
+
+def current(client):
+    portfolio = client.get("/api/portfolio").json()
+    return portfolio["version"], portfolio["projects"][0]["id"]
+
+
+def test_version_filter():
+    assert version_filter(3) == 3
+    assert version_filter(0) == {"$in": [0, None]}
+
+
+def test_update_with_current_version(client):
+    version, project_id = current(client)
+    response = client.put(f"/api/projects/{project_id}", params={"version": version}, json=PROJECT)
+    assert response.status_code == 200
+    assert response.json()["name"] == "Edited"
+    assert current(client)[0] == version + 1
+
+
+def test_stale_version_is_a_conflict(client):
+    version, project_id = current(client)
+    client.put(f"/api/projects/{project_id}", json=PROJECT)
+
+    response = client.put(f"/api/projects/{project_id}", params={"version": version}, json=PROJECT)
+    assert response.status_code == 409
+    assert f"expected version {version}, current version {version + 1}" in response.json()["detail"]
+    response = client.delete(f"/api/projects/{project_id}", params={"version": version})
+    assert response.status_code == 409
+    assert client.get(f"/api/projects/{project_id}").status_code == 200
+
+
+def test_write_without_version_always_applies(client):
+    _, project_id = current(client)
+    client.put(f"/api/projects/{project_id}", json=PROJECT)
+    assert client.delete(f"/api/projects/{project_id}").status_code == 200
+    assert client.get(f"/api/projects/{project_id}").status_code == 404
+
+
+def test_document_without_version_counts_as_zero(client):
+    import server
+    from routes import portfolio
+
+    # Written before versioning existed
+    state = server.storage.state
+    state.set_portfolio({key: value for key, value in state.portfolio.items() if key != "version"})
+    portfolio.portfolio_cache.invalidate()
+    project_id = client.get("/api/projects").json()[0]["id"]
+
+    assert client.put(f"/api/projects/{project_id}", params={"version": 1}, json=PROJECT).status_code == 409
+    assert client.put(f"/api/projects/{project_id}", params={"version": 0}, json=PROJECT).status_code == 200
+
+
+@pytest.mark.parametrize("version", [None, 0])
+def test_missing_project_is_not_found(client, version):
+    params = {} if version is None else {"version": version}
+    response = client.put("/api/projects/no-such-project", params=params, json=PROJECT)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Project not found"
+    assert client.delete("/api/projects/no-such-project", params=params).status_code == 404
+
+
+def test_missing_portfolio_is_not_found(empty_client):
+    response = empty_client.put("/api/projects/anything", json=PROJECT)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Portfolio not found"
@@ -0,0 +1,111 @@
+import pytest
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+
+from services.rate_limit import RateLimiter, TokenBucket, client_ip, rate_limit
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("services.rate_limit.time.monotonic", lambda: now[0])
+    return now
+
+
+def test_bucket_refills_up_to_capacity():
+    bucket = TokenBucket(capacity=2, now=0.0)
+    bucket.tokens = 0
+    bucket.refill(rate=0.5, capacity=2, now=1.0)
+    assert bucket.tokens == 0.5
+    assert bucket.wait_time(rate=0.5) == 1.0
+    bucket.refill(rate=0.5, capacity=2, now=100.0)
+    assert bucket.tokens == 2
+    assert bucket.wait_time(rate=0.5) == 0.0
+
+
+def test_burst_then_wait(clock):
+    limiter = RateLimiter(rate=1, burst=2, global_rate=100, global_burst=100)
+    assert limiter.check("a") == 0
+    assert limiter.check("a") == 0
+    assert limiter.check("a") == pytest.approx(1.0)
+    clock[0] += 0.5
+    assert limiter.check("a") == pytest.approx(0.5)
+    clock[0] += 0.5
+    assert limiter.check("a") == 0
+    assert limiter.stats() == {"clients": 1, "allowed": 3, "rejected": 2}
+
+
+def test_clients_have_separate_buckets(clock):
+    limiter = RateLimiter(rate=1, burst=1, global_rate=100, global_burst=100)
+    assert limiter.check("a") == 0
+    assert limiter.check("b") == 0
+    assert limiter.check("a") > 0
+
+
+def test_global_bucket_limits_all_clients(clock):
+    limiter = RateLimiter(rate=1, burst=5, global_rate=1, global_burst=2)
+    assert limiter.check("a") == 0
+    assert limiter.check("b") == 0
+    assert limiter.check("c") == pytest.approx(1.0)
+
+
+def test_rejection_spends_no_tokens(clock):
+    limiter = RateLimiter(rate=1, burst=1, global_rate=1, global_burst=1)
+    assert limiter.check("a") == 0
+    assert limiter.check("a") > 0
+    clock[0] += 1
+    # The rejected request above must not have drained the refilled token
+    assert limiter.check("b") == 0
+
+
+def test_least_recently_seen_client_is_evicted(clock):
+    limiter = RateLimiter(rate=1, burst=1, global_rate=100, global_burst=100, max_clients=2)
+    limiter.check("a")
+    limiter.check("b")
+    limiter.check("a")
+    limiter.check("c")
+    assert list(limiter._clients) == ["a", "c"]
+    # An evicted client starts over with a full bucket
+    assert limiter.check("b") == 0
+    assert list(limiter._clients) == ["c", "b"]
+    assert limiter.check("c") > 0
+
+
+def test_dependency_sends_retry_after(clock):
+    limiter = RateLimiter(rate=0.1, burst=1, global_rate=100, global_burst=100)
+    app = FastAPI()
+
+    @app.post("/limited", dependencies=[Depends(rate_limit(limiter))])
+    async def limited():
+        return {"ok": True}
+
+    client = TestClient(app)
+    assert client.post("/limited").status_code == 200
+    response = client.post("/limited")
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "10"
+
+
+def request_from(forwarded=None):
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded is not None else []
+    return Request({"type": "http", "headers": headers, "client": ("10.0.0.1", 5000)})
+
+
+def test_forwarded_for_ignored_by_default():
+    assert client_ip(request_from("203.0.113.7")) == "10.0.0.1"
+
+
+@pytest.mark.parametrize("hops, forwarded, expected", [
+    # The proxy appends the address it saw; whatever the client sent sits left of it
+    (1, "1.2.3.4, 203.0.113.7", "203.0.113.7"),
+    (1, "203.0.113.7", "203.0.113.7"),
+    (2, "1.2.3.4, 203.0.113.7, 10.1.1.1", "203.0.113.7"),
+    # Fewer entries than proxies means the header didn't come through them
+    (2, "203.0.113.7", "10.0.0.1"),
+    (1, "", "10.0.0.1"),
+    (1, None, "10.0.0.1"),
+])
+def test_forwarded_for_uses_trusted_hops(monkeypatch, hops, forwarded, expected):
+    monkeypatch.setattr("services.rate_limit.TRUST_PROXY_HEADERS", True)
+    monkeypatch.setattr("services.rate_limit.TRUSTED_PROXY_HOPS", hops)
+    assert client_ip(request_from(forwarded)) == expected
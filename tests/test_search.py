@@ -0,0 +1,96 @@
+from services.search import ProjectSearchIndex, tokenize
+
+PROJECTS = [
+    {"id": "chat", "name": "Realtime Chat", "description": "Messaging over websockets",
+     "details": "Rooms and typing indicators", "technologies": ["React", "Socket.IO"]},
+    {"id": "weather", "name": "Weather Dashboard", "description": "Forecasts on a map",
+     "details": "Charts of the week ahead", "technologies": ["React", "Chart.js"]},
+    {"id": "shop", "name": "Shop", "description": "Storefront with a realtime stock dashboard",
+     "details": "Payments and inventory", "technologies": ["Node.js", "C++"]},
+]
+
+
+def build():
+    index = ProjectSearchIndex()
+    index.rebuild(PROJECTS, version=1)
+    return index
+
+
+def ids(results):
+    return [project_id for project_id, _ in results]
+
+
+def test_tokenize_keeps_symbols():
+    assert tokenize("C++ and C# with Node.js") == ["c++", "and", "c#", "with", "node", "js"]
+
+
+def test_prefix_matches():
+    index = build()
+    assert set(ids(index.search("dash"))) == {"weather", "shop"}
+    assert ids(index.search("sock")) == ["chat"]
+    assert index.search("zzz") == []
+
+
+def test_exact_match_outranks_prefix():
+    index = ProjectSearchIndex()
+    index.rebuild([
+        {"id": "prefix", "name": "Reactive streams"},
+        {"id": "exact", "name": "React app"},
+    ])
+    assert ids(index.search("react")) == ["exact", "prefix"]
+
+
+def test_every_token_must_match():
+    index = build()
+    assert set(ids(index.search("realtime"))) == {"chat", "shop"}
+    assert ids(index.search("realtime dashboard")) == ["shop"]
+    assert index.search("realtime forecasts") == []
+
+
+def test_name_matches_rank_higher():
+    index = build()
+    assert ids(index.search("realtime")) == ["chat", "shop"]
+
+
+def test_put_and_remove_keep_index_current():
+    index = build()
+    index.put({**PROJECTS[0], "name": "Team Chat"})
+    assert ids(index.search("realtime")) == ["shop"]
+    index.remove("shop")
+    assert index.search("realtime") == []
+    assert index.search("inventory") == []
+    assert len(index) == 2
+
+
+def test_limit():
+    index = build()
+    assert len(index.search("r", limit=2)) == 2
+
+
+def test_search_endpoint(client):
+    client.post("/api/projects", json={
+        "name": "Kanban board", "description": "Drag and drop tasks", "details": "Columns",
+        "technologies": ["Svelte"],
+    })
+    hits = client.get("/api/projects/search", params={"q": "kanb svel"}).json()
+    assert [hit["name"] for hit in hits] == ["Kanban board"]
+    assert hits[0]["score"] > 0
+    assert client.get("/api/projects/search", params={"q": "kanban nosuchword"}).json() == []
+
+
+def test_indexes_follow_other_workers_without_cache(client, monkeypatch):
+    import asyncio
+    from datetime import datetime
+    import server
+    from routes import portfolio
+
+    monkeypatch.setattr(portfolio.portfolio_cache, "ttl", 0)
+    assert client.get("/api/projects/search", params={"q": "gossip"}).json() == []
+
+    # Written straight to storage, as another worker would, with no local notice
+    asyncio.run(server.storage.projects.insert({
+        "id": "elsewhere", "name": "Gossip protocol", "description": "d", "details": "x",
+        "technologies": ["Erlang"], "featured": False, "created_at": datetime(2024, 1, 1),
+    }))
+    assert [hit["id"] for hit in client.get("/api/projects/search", params={"q": "gossip"}).json()] == ["elsewhere"]
+    assert "Erlang" in [facet["name"] for facet in client.get("/api/technologies").json()]
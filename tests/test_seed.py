@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+PROJECT = {"name": "Fixture", "description": "d", "details": "x", "technologies": ["Go"]}
+
+
+@pytest.fixture
+def seeding(monkeypatch):
+    monkeypatch.setattr("routes.init_data.ALLOW_SEEDING", True)
+
+
+def stored_projects():
+    """What storage holds, bypassing the cache"""
+    import server
+    return asyncio.run(server.storage.portfolios.get_active())["projects"]
+
+
+def test_invalid_fixture_leaves_storage_untouched(client, seeding):
+    before = client.get("/api/projects").json()
+    fixture = {"projects": [PROJECT, {"name": "Missing fields"}]}
+
+    response = client.post("/api/seed/fixture", json=fixture)
+    assert response.status_code == 422
+    assert client.get("/api/projects").json() == before
+    assert len(stored_projects()) == len(before)
+
+
+def test_fixture_replaces_projects(client, seeding):
+    fixture = {"projects": [PROJECT], "contact_messages": [
+        {"name": "Visitor", "email": "visitor@example.com", "message": "Hi"}
+    ]}
+    response = client.post("/api/seed/fixture", json=fixture)
+    assert response.json() == {"projects": 1, "education": 0, "messages": 1}
+
+    # Cache, indexes and facets all see the new projects
+    assert [project["name"] for project in client.get("/api/projects").json()] == ["Fixture"]
+    assert [hit["name"] for hit in client.get("/api/projects/search", params={"q": "fixture"}).json()] == ["Fixture"]
+    facets = client.get("/api/technologies").json()
+    assert [facet["name"] for facet in facets if facet["count"]] == ["Go"]
+
+
+def test_seeding_is_off_by_default(client):
+    assert client.post("/api/seed/fixture", json={}).status_code == 403
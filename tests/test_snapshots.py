@@ -0,0 +1,47 @@
+import asyncio
+import threading
+
+import brotli
+import pytest
+
+from routes.portfolio import PortfolioEntry
+
+
+def test_concurrent_readers_share_one_compression(monkeypatch):
+    calls = []
+
+    def slow_compress(body, encoding):
+        calls.append(threading.current_thread())
+        return brotli.compress(body)
+
+    monkeypatch.setattr("routes.portfolio.compress_max", slow_compress)
+    entry = PortfolioEntry({"projects": []})
+    body = b'{"projects": []}' * 100
+
+    async def scenario():
+        return await asyncio.gather(*(entry.encoded("projects", body, "br") for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert calls[0] is not threading.main_thread()
+    assert all(brotli.decompress(result) == body for result in results)
+
+
+def test_failed_compression_is_retried(monkeypatch):
+    def failing(body, encoding):
+        raise RuntimeError("compressor failed")
+
+    entry = PortfolioEntry({"projects": []})
+    monkeypatch.setattr("routes.portfolio.compress_max", failing)
+    with pytest.raises(RuntimeError):
+        asyncio.run(entry.encoded("projects", b"body", "br"))
+    monkeypatch.setattr("routes.portfolio.compress_max", lambda body, encoding: b"compressed")
+    assert asyncio.run(entry.encoded("projects", b"body", "br")) == b"compressed"
+
+
+def test_compressed_read_matches_plain(client):
+    plain = client.get("/api/projects", headers={"Accept-Encoding": "identity"})
+    compressed = client.get("/api/projects", headers={"Accept-Encoding": "br"})
+    assert compressed.headers["content-encoding"] == "br"
+    assert compressed.json() == plain.json()
+    assert compressed.headers["etag"] != plain.headers["etag"]
@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+from services.technologies import TechnologyFacets, technology_key
+
+
+@pytest.mark.parametrize("names", [
+    ["React", "React.js", "ReactJS", "react js"],
+    ["Tailwind CSS", "TailwindCSS", "tailwind-css"],
+    ["Node.js", "node"],
+])
+def test_spellings_share_a_key(names):
+    assert len({technology_key(name) for name in names}) == 1
+
+
+def test_distinct_technologies_stay_apart():
+    assert technology_key("JS") == "js"
+    assert technology_key("Java") != technology_key("JavaScript")
+    assert technology_key("C++") != technology_key("C")
+
+
+def test_facets_merge_spellings():
+    facets = TechnologyFacets()
+    facets.rebuild([
+        {"id": "a", "technologies": ["React.js", "Node.js"]},
+        {"id": "b", "technologies": ["React.js"]},
+        {"id": "c", "technologies": ["React"]},
+    ], version=1)
+    counts = {facet["name"]: facet["count"] for facet in json.loads(facets.json())}
+    assert counts == {"React.js": 3, "Node.js": 1}